@@ -17,9 +17,45 @@ DATABASES = {
         'PASSWORD': os.environ.get('POSTGRES_PASSWORD'),
         'HOST': os.environ.get('DB_HOST'),
         'PORT': os.environ.get('DB_PORT'),
+        'CONN_MAX_AGE': int(os.environ.get('CONN_MAX_AGE', 60)),
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'foodgram'),
+    }
+}
+
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 300))
+CATALOG_SNAPSHOT_TTL = int(os.environ.get('CATALOG_SNAPSHOT_TTL', 60))
+
+AUTH_TOKEN_CACHE_SIZE = int(os.environ.get('AUTH_TOKEN_CACHE_SIZE', 1000))
+AUTH_TOKEN_CACHE_TIMEOUT = int(os.environ.get('AUTH_TOKEN_CACHE_TIMEOUT', 300))
+AUTH_TOKEN_SHARED_CACHE = (
+    os.environ.get('AUTH_TOKEN_SHARED_CACHE', 'False') == 'True'
+)
+
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', 'False') == 'True'
+ASYNC_DB_THREADS = int(os.environ.get('ASYNC_DB_THREADS', 4))
+
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', 6))
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', 5))
+
+FAST_RECIPE_SERIALIZER = (
+    os.environ.get('FAST_RECIPE_SERIALIZER', 'False') == 'True'
+)
+
+BACKGROUND_JOBS = os.environ.get('BACKGROUND_JOBS', 'True') == 'True'
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 5))
+JOB_RETRY_DELAY = int(os.environ.get('JOB_RETRY_DELAY', 10))
+JOB_RETENTION_DAYS = int(os.environ.get('JOB_RETENTION_DAYS', 7))
+
 SECRET_KEY = os.environ.get('SECRET_KEY')
 
 DEBUG = False
@@ -42,6 +78,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'recipes.metrics.MetricsMiddleware',
+    'recipes.compression.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -59,7 +97,16 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'recipes.authentication.CachedTokenAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'recipes.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'recipes.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_PAGINATION_CLASS': 'recipes.paginations.CorePagination',
     'PAGE_SIZE': 6,
@@ -141,5 +188,24 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'backend_static')
 
 MEDIA_URL = "/backend_media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "backend_media")
+EXPORTS_ROOT = os.environ.get('EXPORTS_ROOT',
+                              os.path.join(BASE_DIR, 'backend_exports'))
+
+BULK_RECIPES_LIMIT = int(os.environ.get('BULK_RECIPES_LIMIT', 100))
+
+FEED_FANOUT = os.environ.get('FEED_FANOUT', 'False') == 'True'
+FEED_FANOUT_LIMIT = int(os.environ.get('FEED_FANOUT_LIMIT', 1000))
+
+INGREDIENT_SEARCH_LIMIT = int(os.environ.get('INGREDIENT_SEARCH_LIMIT', 20))
+
+SHOPPING_LIST_PDF_FONT = os.environ.get(
+    'SHOPPING_LIST_PDF_FONT',
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'
+)
+
+METRICS_ALLOWED_IPS = [
+    address for address in os.environ.get('METRICS_ALLOWED_IPS', '').split(',')
+    if address
+]
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -1,11 +1,12 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
-from .models import AppUser, Ingredient, Favorite, Recipe, RecipeIngredient, Tag
+from .models import (AppUser, Favorite, Ingredient, Job, Recipe,
+                     RecipeIngredient, Tag)
 
 
 class UserAdmin(BaseUserAdmin):
-    list_display = ('email', )
+    list_display = ('email', 'recipes_count', 'followers_count')
     search_fields = ('email', 'first_name')
     ordering = ('email',)
 
@@ -21,6 +22,7 @@ class TagRecipeInline(admin.TabularInline):
 
 
 class RecipeAdmin(admin.ModelAdmin):
+    list_display = ('name', 'author', 'favorites_count')
     inlines = (IngredientRecipeInLine, TagRecipeInline)
 
 
@@ -30,3 +32,4 @@ admin.site.register(RecipeIngredient)
 admin.site.register(Tag)
 admin.site.register(Favorite)
 admin.site.register(AppUser, UserAdmin)
+admin.site.register(Job)
@@ -0,0 +1,208 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.db import close_old_connections
+from django.http import Http404
+from django.urls import path
+from django.utils.cache import get_conditional_response
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .cache import (get_cached_response, set_validators,
+                    store_response)
+from .fast_serializers import get_recipe_rows, serialize_recipe_rows
+from .paginations import CorePagination, FetchedPage
+from .renderers import FastJSONRenderer
+from .serializers import GetRecipeSerializer
+from .utils import get_requested_fields, get_subscribed_authors
+from .views import (IngredientViewSet, RecipeViewSet, TagViewSet,
+                    serialize_subscriptions, subscriptions_list)
+
+database_threads = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_DB_THREADS, thread_name_prefix='database'
+)
+
+
+async def database(func, *args, **kwargs):
+    def call():
+        close_old_connections()
+        return func(*args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(
+        database_threads, contextvars.copy_context().run, call
+    )
+
+
+def render_response(response):
+    if isinstance(response, Response):
+        response.accepted_renderer = FastJSONRenderer()
+        response.accepted_media_type = FastJSONRenderer.media_type
+        response.renderer_context = {'response': response}
+        response.render()
+    return response
+
+
+def error_response(error):
+    response = api_settings.EXCEPTION_HANDLER(error, {})
+    if isinstance(error, (exceptions.AuthenticationFailed,
+                          exceptions.NotAuthenticated)):
+        response['WWW-Authenticate'] = 'Token'
+    return response
+
+
+def get_request(request):
+    return Request(request, authenticators=[
+        authentication()
+        for authentication in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    ])
+
+
+async def get_user(request):
+    return await database(lambda: request.user)
+
+
+def get_view(view_class, request, **kwargs):
+    return view_class(request=request, format_kwarg=None, kwargs=kwargs,
+                      args=())
+
+
+async def paginate(request, pagination, queryset, serialize_page):
+    number = request.query_params.get(pagination.page_query_param, '1')
+    if number.isdigit() and int(number) > 0:
+        size = pagination.get_page_size(request)
+        start = (int(number) - 1) * size
+        count, items = await asyncio.gather(
+            database(queryset.count),
+            database(list, queryset[start:start + size])
+        )
+        queryset = FetchedPage(count, start, items)
+    page = await database(pagination.paginate_queryset, queryset, request)
+    data = await database(serialize_page, page)
+    return pagination.get_paginated_response(data)
+
+
+async def cached_read(request, resources, get_response):
+    if not request.user.is_anonymous:
+        return await get_response()
+    key, response = await database(get_cached_response, request, resources)
+    if response is None:
+        response = await get_response()
+        await database(store_response, key, response)
+    return response
+
+
+async def conditional_read(request, view, queryset, get_response):
+    etag, last_modified = await database(view.get_validators, request,
+                                         queryset)
+    response = None
+    if etag is not None:
+        response = get_conditional_response(request, etag=etag,
+                                            last_modified=last_modified)
+    if response is None:
+        response = await cached_read(request, view.cache_resources,
+                                     get_response)
+        if response.status_code != 200:
+            return response
+    if etag is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def get_recipe_list_querysets(view):
+    return (view.filter_queryset(view.get_queryset()),
+            view.filter_queryset(view.get_validator_queryset()))
+
+
+async def recipe_list(request):
+    request = get_request(request)
+    user = await get_user(request)
+    view = get_view(RecipeViewSet, request)
+    queryset, validator_queryset = await database(
+        get_recipe_list_querysets, view
+    )
+    if settings.FAST_RECIPE_SERIALIZER:
+        fields = get_requested_fields(request, GetRecipeSerializer.Meta.fields)
+        queryset = get_recipe_rows(queryset, user, fields)
+
+        def serialize_page(page):
+            return serialize_recipe_rows(page, request, fields)
+    else:
+        def serialize_page(page):
+            return view.get_serializer(page, many=True).data
+    return await conditional_read(
+        request, view, validator_queryset,
+        lambda: paginate(request, view.paginator, queryset, serialize_page)
+    )
+
+
+async def recipe_detail(request, pk):
+    request = get_request(request)
+    await get_user(request)
+    view = get_view(RecipeViewSet, request, pk=pk)
+    return await conditional_read(
+        request, view, view.get_object_validator_queryset(),
+        lambda: database(
+            lambda: Response(view.get_serializer(view.get_object()).data)
+        )
+    )
+
+
+async def subscription_list(request):
+    drf_request = get_request(request)
+    user = await get_user(drf_request)
+    if user.is_anonymous:
+        return await sync_to_async(subscriptions_list)(request)
+    return await paginate(
+        drf_request, CorePagination(), get_subscribed_authors(user),
+        lambda authors: serialize_subscriptions(drf_request, authors)
+    )
+
+
+def async_read(async_view, sync_view):
+    async def view(request, *args, **kwargs):
+        if request.method != 'GET' or 'cursor' in request.GET:
+            return await sync_to_async(sync_view)(request, *args, **kwargs)
+        if async_view is None:
+            return await database(sync_view, request, *args, **kwargs)
+        try:
+            response = await async_view(request, *args, **kwargs)
+        except (exceptions.APIException, Http404, PermissionDenied) as error:
+            response = error_response(error)
+        return render_response(response)
+    view.csrf_exempt = True
+    return view
+
+
+urlpatterns = [
+    path('api/users/subscriptions/',
+         async_read(subscription_list, subscriptions_list),
+         name='user_subscriptions'),
+    path('api/recipes/',
+         async_read(recipe_list, RecipeViewSet.as_view(
+             {'get': 'list', 'post': 'create'}
+         )),
+         name='recipes-list'),
+    path('api/recipes/<int:pk>/',
+         async_read(recipe_detail, RecipeViewSet.as_view(
+             {'get': 'retrieve', 'put': 'update',
+              'patch': 'partial_update', 'delete': 'destroy'}
+         )),
+         name='recipes-detail'),
+    path('api/tags/',
+         async_read(None, TagViewSet.as_view({'get': 'list'})),
+         name='tags-list'),
+    path('api/tags/<int:pk>/',
+         async_read(None, TagViewSet.as_view({'get': 'retrieve'})),
+         name='tags-detail'),
+    path('api/ingredients/',
+         async_read(None, IngredientViewSet.as_view({'get': 'list'})),
+         name='ingredients-list'),
+    path('api/ingredients/<int:pk>/',
+         async_read(None, IngredientViewSet.as_view({'get': 'retrieve'})),
+         name='ingredients-detail'),
+]
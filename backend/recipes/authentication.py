@@ -0,0 +1,98 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+from .cache import bump_version, get_version
+
+TOKEN_KEY = 'token:{}'
+AUTH_VERSION = 'auth:{}'
+
+
+def get_token_cache_key(key):
+    return TOKEN_KEY.format(hashlib.sha256(key.encode()).hexdigest())
+
+
+def get_auth_version(user_id):
+    return get_version(AUTH_VERSION.format(user_id))
+
+
+def bump_auth_version(user_id):
+    bump_version(AUTH_VERSION.format(user_id))
+
+
+class TokenCache:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[2] < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[:2]
+
+    def set(self, key, user, version):
+        expires = time.monotonic() + settings.AUTH_TOKEN_CACHE_TIMEOUT
+        with self.lock:
+            self.entries[key] = (user, version, expires)
+            self.entries.move_to_end(key)
+            while len(self.entries) > settings.AUTH_TOKEN_CACHE_SIZE:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+
+tokens = TokenCache()
+
+
+def forget_token(key):
+    tokens.delete(key)
+    if settings.AUTH_TOKEN_SHARED_CACHE:
+        cache.delete(get_token_cache_key(key))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+
+    def authenticate_credentials(self, key):
+        entry = tokens.get(key)
+        if entry is None and settings.AUTH_TOKEN_SHARED_CACHE:
+            entry = cache.get(get_token_cache_key(key))
+        if entry is not None:
+            user, version = entry
+            if get_auth_version(user.pk) == version:
+                tokens.set(key, user, version)
+                return self.build_result(key, user)
+        model = self.get_model()
+        try:
+            token = model.objects.select_related('user').get(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.')
+            )
+        version = get_auth_version(token.user_id)
+        tokens.set(key, token.user, version)
+        if settings.AUTH_TOKEN_SHARED_CACHE:
+            cache.set(get_token_cache_key(key), (token.user, version),
+                      settings.AUTH_TOKEN_CACHE_TIMEOUT)
+        return self.build_result(key, token.user)
+
+    def build_result(self, key, user):
+        user = copy.copy(user)
+        return user, self.get_model()(key=key, user=user)
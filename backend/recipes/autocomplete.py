@@ -0,0 +1,94 @@
+import bisect
+import threading
+import time
+from collections import Counter, defaultdict
+
+from .cache import get_version, is_stale
+from .models import Ingredient
+
+TRIGRAM_THRESHOLD = 0.3
+
+
+def get_trigrams(value):
+    value = f'  {value} '
+    return {value[i:i + 3] for i in range(len(value) - 2)}
+
+
+class IngredientIndex:
+    def __init__(self, ingredients):
+        self.items = sorted(ingredients,
+                            key=lambda item: item['name'].casefold())
+        self.keys = [item['name'].casefold() for item in self.items]
+        self.trigrams = [get_trigrams(key) for key in self.keys]
+        self.postings = defaultdict(list)
+        for position, trigrams in enumerate(self.trigrams):
+            for trigram in trigrams:
+                self.postings[trigram].append(position)
+
+    def search(self, query, limit):
+        query = query.strip().casefold()
+        positions = self.prefix_matches(query, limit)
+        if len(positions) < limit:
+            positions += self.substring_matches(query, positions,
+                                                limit - len(positions))
+        if len(positions) < limit and len(query) >= 3:
+            positions += self.trigram_matches(query, positions,
+                                              limit - len(positions))
+        return [self.items[position] for position in positions]
+
+    def prefix_matches(self, query, limit):
+        positions = []
+        position = bisect.bisect_left(self.keys, query)
+        while (position < len(self.keys) and len(positions) < limit
+               and self.keys[position].startswith(query)):
+            positions.append(position)
+            position += 1
+        return positions
+
+    def substring_matches(self, query, found, limit):
+        found = set(found)
+        matches = []
+        for position, key in enumerate(self.keys):
+            offset = key.find(query)
+            if offset > 0 and position not in found:
+                matches.append((offset, position))
+        matches.sort()
+        return [position for _, position in matches[:limit]]
+
+    def trigram_matches(self, query, found, limit):
+        found = set(found)
+        query_trigrams = get_trigrams(query)
+        shared = Counter()
+        for trigram in query_trigrams:
+            shared.update(self.postings.get(trigram, ()))
+        matches = []
+        for position, count in shared.items():
+            if position in found:
+                continue
+            score = count / len(query_trigrams | self.trigrams[position])
+            if score >= TRIGRAM_THRESHOLD:
+                matches.append((-score, position))
+        matches.sort()
+        return [position for _, position in matches[:limit]]
+
+
+_index = None
+_index_version = None
+_index_built = 0
+_lock = threading.Lock()
+
+
+def get_ingredient_index():
+    global _index, _index_version, _index_built
+    version = get_version('ingredients')
+    if _index is None or is_stale(_index_version, _index_built, version):
+        with _lock:
+            if _index is None or is_stale(_index_version, _index_built,
+                                          version):
+                _index = IngredientIndex(list(Ingredient.objects.values(
+                    'id', 'name', 'measurement_unit'
+                )))
+                _index_version = version
+                _index_built = time.monotonic()
+    return _index
+
@@ -0,0 +1,61 @@
+import json
+import math
+import statistics
+import subprocess
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    index = max(math.ceil(share / 100 * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+def summarize(timings):
+    return {
+        'p50_ms': round(percentile(timings, 50) * 1000, 3),
+        'p95_ms': round(percentile(timings, 95) * 1000, 3),
+        'p99_ms': round(percentile(timings, 99) * 1000, 3),
+        'mean_ms': round(statistics.mean(timings) * 1000, 3),
+    }
+
+
+def measure(func, *args, **kwargs):
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+    return result, elapsed, len(queries)
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_report(path, results, **extra):
+    report = {
+        'commit': get_commit(),
+        'created': timezone.now().isoformat(),
+        'database': connection.vendor,
+        **extra,
+        'results': results,
+    }
+    with open(path, 'w', encoding='UTF-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    return report
+
+
+def load_report(path):
+    with open(path, encoding='UTF-8') as file:
+        return json.load(file)['results']
@@ -0,0 +1,275 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Max
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from .compression import ENCODINGS, choose_encoding
+from .models import ResourceVersion
+from .renderers import FastJSONRenderer
+
+RESPONSE_KEY = 'response:{}'
+STATS_KEY = 'response_cache:{}'
+
+
+def get_versions(resources):
+    versions = dict(ResourceVersion.objects.filter(
+        resource__in=resources
+    ).values_list('resource', 'version'))
+    missing = [resource for resource in resources if resource not in versions]
+    if missing:
+        ResourceVersion.objects.bulk_create(
+            (ResourceVersion(resource=resource, version=time.time_ns())
+             for resource in missing),
+            ignore_conflicts=True
+        )
+        versions.update(ResourceVersion.objects.filter(
+            resource__in=missing
+        ).values_list('resource', 'version'))
+    return [versions[resource] for resource in resources]
+
+
+def get_version(resource):
+    return get_versions([resource])[0]
+
+
+def get_request_versions(request, resources, extra=()):
+    versions = request.__dict__.setdefault('resource_versions', {})
+    missing = [resource for resource in (*resources, *extra)
+               if resource not in versions]
+    if missing:
+        versions.update(zip(missing, get_versions(missing)))
+    return [versions[resource] for resource in resources]
+
+
+def bump_versions(resources):
+    resources = sorted(resources)
+    ResourceVersion.objects.filter(resource__in=resources).update(
+        version=F('version') + 1
+    )
+    ResourceVersion.objects.bulk_create(
+        (ResourceVersion(resource=resource, version=time.time_ns())
+         for resource in resources),
+        ignore_conflicts=True
+    )
+
+
+class PendingBumps(set):
+    done = False
+
+    def __call__(self):
+        self.done = True
+        bump_versions(self)
+
+
+def bump_version(resource):
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        bump_versions([resource])
+        return
+    pending = getattr(connection, 'pending_bumps', None)
+    if pending is None or pending.done or not any(
+            entry[1] is pending for entry in connection.run_on_commit):
+        pending = connection.pending_bumps = PendingBumps()
+        transaction.on_commit(pending)
+    pending.add(resource)
+
+
+def record(outcome):
+    key = STATS_KEY.format(outcome)
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def get_stats():
+    hits = cache.get(STATS_KEY.format('hit'), 0)
+    misses = cache.get(STATS_KEY.format('miss'), 0)
+    return hits, misses
+
+
+def reset_stats():
+    cache.delete_many([STATS_KEY.format('hit'), STATS_KEY.format('miss')])
+
+
+def get_response_key(request, resources):
+    versions = ':'.join(map(str, get_request_versions(request, resources)))
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return RESPONSE_KEY.format(f'{versions}:{path}')
+
+
+def get_cached_data(request, resources):
+    key = get_response_key(request, resources)
+    data = cache.get(key)
+    record('miss' if data is None else 'hit')
+    return key, data
+
+
+def get_validators(request, queryset, resources, extra=()):
+    stats = queryset.order_by().aggregate(
+        last_modified=Max('updated'), total=Count('id')
+    )
+    if not stats['total']:
+        return None, None
+    resources = list(resources)
+    if request.user.is_authenticated:
+        resources.append(f'user:{request.user.id}')
+        extra = ()
+    last_modified = int(stats['last_modified'].timestamp())
+    state = ':'.join(map(str, (
+        request.get_full_path(), request.user.id, stats['total'],
+        stats['last_modified'].isoformat(),
+        *get_request_versions(request, resources, extra)
+    )))
+    etag = f'"{hashlib.md5(state.encode()).hexdigest()}"'
+    if request.user.is_authenticated:
+        return etag, None
+    return etag, last_modified
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    patch_vary_headers(response, ('Authorization',))
+
+
+def get_cached_response(request, resources):
+    key, data = get_cached_data(request, resources)
+    if data is None:
+        return key, None
+    response = Response(data)
+    response['X-Cache'] = 'HIT'
+    return key, response
+
+
+def store_response(key, response):
+    if response.status_code == 200:
+        cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+    response['X-Cache'] = 'MISS'
+
+
+class CachedReadMixin:
+    cache_resources = ()
+
+    def cached_response(self, action, request, *args, **kwargs):
+        if not request.user.is_anonymous:
+            return action(request, *args, **kwargs)
+        key, response = get_cached_response(request, self.cache_resources)
+        if response is None:
+            response = action(request, *args, **kwargs)
+            store_response(key, response)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request,
+                                    *args, **kwargs)
+
+
+class ConditionalGetMixin:
+    validator_resources = ()
+
+    def get_validators(self, request, queryset):
+        return get_validators(request, queryset, self.validator_resources,
+                              getattr(self, 'cache_resources', ()))
+
+    def conditional_response(self, action, queryset, request,
+                             *args, **kwargs):
+        etag, last_modified = self.get_validators(request, queryset)
+        if etag is None:
+            return action(request, *args, **kwargs)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = action(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        set_validators(response, etag, last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_validator_queryset())
+        return self.conditional_response(super().list, queryset, request,
+                                         *args, **kwargs)
+
+    def get_object_validator_queryset(self):
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        return self.get_validator_queryset().filter(
+            **{self.lookup_field: self.kwargs[lookup]}
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, self.get_object_validator_queryset(), request,
+            *args, **kwargs
+        )
+
+
+def is_stale(version, built, current):
+    return (version != current
+            or time.monotonic() - built > settings.CATALOG_SNAPSHOT_TTL)
+
+
+class CatalogSnapshot:
+    def __init__(self, resource):
+        self.resource = resource
+        self.lock = threading.Lock()
+        self.snapshot = (None, 0, None, None, {})
+
+    def get(self, render, encoding=None):
+        version = get_version(self.resource)
+        if is_stale(*self.snapshot[:2], version):
+            with self.lock:
+                if is_stale(*self.snapshot[:2], version):
+                    content = render()
+                    etag = f'"{hashlib.sha256(content).hexdigest()}"'
+                    self.snapshot = (version, time.monotonic(), content,
+                                     etag, {})
+        _, _, content, etag, encoded = self.snapshot
+        if encoding is None or len(content) < settings.COMPRESSION_MIN_SIZE:
+            return content, etag, None
+        if encoding not in encoded:
+            encoded[encoding] = ENCODINGS[encoding](content)
+        if len(encoded[encoding]) >= len(content):
+            return content, etag, None
+        return encoded[encoding], f'W/{etag}', encoding
+
+
+def snapshot_response(request, snapshot, render):
+    content, etag, encoding = snapshot.get(
+        render, choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    )
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(content, content_type='application/json')
+        if encoding is not None:
+            response['Content-Encoding'] = encoding
+    response['ETag'] = etag
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+class CatalogSnapshotMixin:
+    snapshot = None
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params or request.accepted_renderer.format != 'json':
+            return super().list(request, *args, **kwargs)
+        return snapshot_response(request, self.snapshot, self.render_catalog)
+
+    def render_catalog(self):
+        serializer = self.get_serializer(self.get_queryset(), many=True)
+        return FastJSONRenderer().render(serializer.data)
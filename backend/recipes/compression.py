@@ -0,0 +1,97 @@
+import asyncio
+import gzip
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript',
+                      'application/xml', 'application/vnd.oai.openapi')
+
+
+def compress_gzip(content):
+    return gzip.compress(content, compresslevel=settings.GZIP_LEVEL, mtime=0)
+
+
+def compress_brotli(content):
+    return brotli.compress(content, quality=settings.BROTLI_QUALITY)
+
+
+ENCODINGS = {'gzip': compress_gzip}
+if brotli is not None:
+    ENCODINGS = {'br': compress_brotli, **ENCODINGS}
+
+
+def get_accepted_encodings(header):
+    accepted = {}
+    for item in header.split(','):
+        name, _, parameters = item.strip().partition(';')
+        quality = 1.0
+        parameter = parameters.strip()
+        if parameter.startswith('q='):
+            try:
+                quality = float(parameter[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    return accepted
+
+
+def choose_encoding(header):
+    accepted = get_accepted_encodings(header)
+    best = None
+    for name in ENCODINGS:
+        quality = accepted.get(name, accepted.get('*', 0.0))
+        if quality > 0 and (best is None or quality > best[1]):
+            best = (name, quality)
+    return best[0] if best else None
+
+
+def is_compressible(response):
+    return (
+        len(response.content) >= settings.COMPRESSION_MIN_SIZE
+        and response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES)
+    )
+
+
+class CompressionMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.acall(request)
+        return self.compress(request, self.get_response(request))
+
+    async def acall(self, request):
+        return self.compress(request, await self.get_response(request))
+
+    def compress(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if not is_compressible(response):
+            return response
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING',
+                                                    ''))
+        if encoding is None:
+            return response
+        content = ENCODINGS[encoding](response.content)
+        if len(content) >= len(response.content):
+            return response
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        response['Content-Encoding'] = encoding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = f'W/{etag}'
+        return response
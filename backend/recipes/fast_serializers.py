@@ -0,0 +1,129 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+from .models import Recipe, RecipeIngredient
+from .serializers import GetRecipeSerializer, represent_renditions
+from .utils import get_requested_fields
+
+RECIPE_FIELDS = GetRecipeSerializer.Meta.fields
+COLUMNS = {
+    'author': ('author_id', 'author__email', 'author__username',
+               'author__first_name', 'author__last_name'),
+    'name': ('name',),
+    'image': ('image',),
+    'images': ('image_renditions',),
+    'text': ('text',),
+    'cooking_time': ('cooking_time',),
+}
+FLAG_COLUMNS = {
+    'author': ('author_is_subscribed',),
+    'is_favorited': ('is_favorited',),
+    'is_in_shopping_cart': ('is_in_shopping_cart',),
+}
+
+
+def get_recipe_rows(queryset, user, fields=RECIPE_FIELDS):
+    columns = ['id']
+    for name in fields:
+        columns.extend(COLUMNS.get(name, ()))
+        if not user.is_anonymous:
+            columns.extend(FLAG_COLUMNS.get(name, ()))
+    return queryset.prefetch_related(None).values(*columns)
+
+
+def get_recipe_tags(recipe_ids):
+    tags = defaultdict(list)
+    rows = Recipe.tags.through.objects.filter(
+        recipe_id__in=recipe_ids
+    ).order_by('tag_id').values_list(
+        'recipe_id', 'tag_id', 'tag__name', 'tag__color', 'tag__slug'
+    )
+    for recipe_id, tag_id, name, color, slug in rows:
+        tags[recipe_id].append(
+            {'id': tag_id, 'name': name, 'color': color, 'slug': slug}
+        )
+    return tags
+
+
+def get_recipe_ingredients(recipe_ids):
+    ingredients = defaultdict(list)
+    rows = RecipeIngredient.objects.filter(
+        recipe_id__in=recipe_ids
+    ).order_by('id').values_list(
+        'recipe_id', 'ingredient_id', 'ingredient__name',
+        'ingredient__measurement_unit', 'amount'
+    )
+    for recipe_id, ingredient_id, name, unit, amount in rows:
+        ingredients[recipe_id].append({
+            'id': ingredient_id,
+            'name': name,
+            'measurement_unit': unit,
+            'amount': float(amount),
+        })
+    return ingredients
+
+
+def represent_image(name, request):
+    if not name:
+        return None
+    url = default_storage.url(name)
+    if request is not None:
+        return request.build_absolute_uri(url)
+    return url
+
+
+def represent_author(row):
+    if row['author_id'] is None:
+        return None
+    return {
+        'email': row['author__email'],
+        'id': row['author_id'],
+        'username': row['author__username'],
+        'first_name': row['author__first_name'],
+        'last_name': row['author__last_name'],
+        'is_subscribed': row.get('author_is_subscribed', False),
+    }
+
+
+def serialize_recipe_rows(rows, request, fields=RECIPE_FIELDS):
+    rows = list(rows)
+    recipe_ids = [row['id'] for row in rows]
+    tags = get_recipe_tags(recipe_ids) if 'tags' in fields else None
+    ingredients = (get_recipe_ingredients(recipe_ids)
+                   if 'ingredients' in fields else None)
+    representers = {
+        'id': lambda row: row['id'],
+        'tags': lambda row: tags[row['id']],
+        'author': represent_author,
+        'ingredients': lambda row: ingredients[row['id']],
+        'is_favorited': lambda row: row.get('is_favorited', False),
+        'is_in_shopping_cart': (
+            lambda row: row.get('is_in_shopping_cart', False)
+        ),
+        'name': lambda row: row['name'],
+        'image': lambda row: represent_image(row['image'], request),
+        'images': lambda row: represent_renditions(row['image_renditions'],
+                                                   request),
+        'text': lambda row: row['text'],
+        'cooking_time': lambda row: row['cooking_time'],
+    }
+    representers = [(name, representers[name]) for name in fields]
+    return [{name: represent(row) for name, represent in representers}
+            for row in rows]
+
+
+class FastRecipeListMixin:
+
+    def list(self, request, *args, **kwargs):
+        if not settings.FAST_RECIPE_SERIALIZER:
+            return super().list(request, *args, **kwargs)
+        fields = get_requested_fields(request, RECIPE_FIELDS)
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(
+            get_recipe_rows(queryset, request.user, fields)
+        )
+        return self.get_paginated_response(
+            serialize_recipe_rows(page, request, fields)
+        )
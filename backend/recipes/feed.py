@@ -0,0 +1,126 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from .cache import bump_version, get_version
+from .models import AppUser, FeedEntry, Recipe, Subscription
+
+BATCH_SIZE = 1000
+LARGE_AUTHORS_KEY = 'feed:large_authors:{}'
+FILL_SQL = (
+    'INSERT INTO recipes_feedentry (user_id, recipe_id, author_id) '
+    'SELECT subscription.user_id, recipe.id, recipe.author_id '
+    'FROM recipes_subscription subscription '
+    'JOIN recipes_recipe recipe '
+    'ON recipe.author_id = subscription.author_id '
+    'JOIN recipes_appuser author ON author.id = subscription.author_id '
+    'WHERE author.followers_count <= %s'
+)
+
+
+def get_followers_count(author_id):
+    return AppUser.objects.filter(pk=author_id).values_list(
+        'followers_count', flat=True
+    ).first()
+
+
+def is_fanned_out(author_id):
+    followers = get_followers_count(author_id)
+    return followers is not None and followers <= settings.FEED_FANOUT_LIMIT
+
+
+def add_entries(author_id, user_ids, recipe_ids):
+    FeedEntry.objects.bulk_create(
+        (FeedEntry(user_id=user_id, recipe_id=recipe_id, author_id=author_id)
+         for user_id in user_ids for recipe_id in recipe_ids),
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True
+    )
+
+
+def fan_out_recipe(recipe_id):
+    author_id = Recipe.objects.filter(pk=recipe_id).values_list(
+        'author', flat=True
+    ).first()
+    if author_id is None or not is_fanned_out(author_id):
+        return 0
+    followers = list(Subscription.objects.filter(
+        author_id=author_id
+    ).values_list('user', flat=True))
+    add_entries(author_id, followers, [recipe_id])
+    return len(followers)
+
+
+def fill_author_feed(author_id, user_ids=None):
+    if not is_fanned_out(author_id):
+        return 0
+    if user_ids is None:
+        user_ids = list(Subscription.objects.filter(
+            author_id=author_id
+        ).values_list('user', flat=True))
+    recipe_ids = list(Recipe.objects.filter(
+        author_id=author_id
+    ).values_list('id', flat=True))
+    add_entries(author_id, user_ids, recipe_ids)
+    return len(user_ids) * len(recipe_ids)
+
+
+def drop_author_feed(author_id):
+    if is_fanned_out(author_id):
+        return 0
+    deleted, _ = FeedEntry.objects.filter(author_id=author_id).delete()
+    return deleted
+
+
+def remove_author_feed(user_id, author_id):
+    FeedEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+def rebuild_feeds():
+    with transaction.atomic():
+        FeedEntry.objects.all().delete()
+        with connection.cursor() as cursor:
+            cursor.execute(FILL_SQL, [settings.FEED_FANOUT_LIMIT])
+    bump_version('feed')
+    return FeedEntry.objects.count()
+
+
+def get_large_authors():
+    key = LARGE_AUTHORS_KEY.format(get_version('feed'))
+    authors = cache.get(key)
+    if authors is None:
+        authors = list(AppUser.objects.filter(
+            followers_count__gt=settings.FEED_FANOUT_LIMIT
+        ).values_list('id', flat=True))
+        cache.set(key, authors)
+    return authors
+
+
+def get_feed_ids(user, before=None, limit=10):
+    entries = FeedEntry.objects.filter(user=user)
+    if before is not None:
+        entries = entries.filter(recipe__lt=before)
+    recipe_ids = list(entries.order_by('-recipe_id').values_list(
+        'recipe', flat=True
+    )[:limit])
+    large_authors = get_large_authors()
+    if not large_authors:
+        return recipe_ids
+    recipes = Recipe.objects.filter(author__in=Subscription.objects.filter(
+        user=user, author__in=large_authors
+    ).values('author'))
+    if before is not None:
+        recipes = recipes.filter(id__lt=before)
+    recipe_ids.extend(recipes.order_by('-id').values_list(
+        'id', flat=True
+    )[:limit])
+    return sorted(set(recipe_ids), reverse=True)[:limit]
+
+
+def get_joined_feed_ids(user, before=None, limit=10):
+    recipes = Recipe.objects.filter(
+        author__in=Subscription.objects.filter(user=user).values('author')
+    )
+    if before is not None:
+        recipes = recipes.filter(id__lt=before)
+    return list(recipes.order_by('-id').values_list('id', flat=True)[:limit])
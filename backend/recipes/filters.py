@@ -1,11 +1,7 @@
 from django_filters import rest_framework as filters
-from rest_framework.filters import SearchFilter
 
-from .models import Recipe, Tag
-
-
-class IngredientFilter(SearchFilter):
-    search_param = 'name'
+from .models import Tag
+from .search import search_recipes
 
 
 class RecipeFilter(filters.FilterSet):
@@ -18,13 +14,17 @@ class RecipeFilter(filters.FilterSet):
         to_field_name='slug',
         queryset=Tag.objects.all()
     )
+    search = filters.CharFilter(method='get_search')
 
     def get_is_favorited(self, queryset, name, value):
-        if value:
-            return Recipe.objects.filter(in_favorite__user=self.request.user)
-        return Recipe.objects.all()
+        if value and self.request.user.is_authenticated:
+            return queryset.filter(in_favorite__user=self.request.user)
+        return queryset
 
     def get_is_in_shopping_cart(self, queryset, name, value):
-        if value:
-            return Recipe.objects.filter(recipes_in__user=self.request.user)
-        return Recipe.objects.all()
+        if value and self.request.user.is_authenticated:
+            return queryset.filter(recipes_in__user=self.request.user)
+        return queryset
+
+    def get_search(self, queryset, name, value):
+        return search_recipes(queryset, value)
@@ -0,0 +1,57 @@
+import io
+import os
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+RENDITIONS = {
+    'avatar': ((96, 96), True),
+    'card': ((480, 360), True),
+    'detail': ((1280, 1280), False),
+}
+FORMATS = {
+    'webp': 'WEBP',
+    'jpeg': 'JPEG',
+}
+QUALITY = 82
+
+
+def get_rendition_name(name, size, extension):
+    stem = os.path.splitext(name)[0]
+    return f'renditions/{stem}_{size}.{extension}'
+
+
+def resize(image, box, crop):
+    if crop:
+        return ImageOps.fit(image, box, Image.LANCZOS)
+    image = image.copy()
+    image.thumbnail(box, Image.LANCZOS)
+    return image
+
+
+def make_renditions(name):
+    with default_storage.open(name) as file:
+        image = Image.open(file)
+        image = ImageOps.exif_transpose(image).convert('RGB')
+    renditions = {}
+    for size, (box, crop) in RENDITIONS.items():
+        resized = resize(image, box, crop)
+        renditions[size] = {}
+        for extension, image_format in FORMATS.items():
+            buffer = io.BytesIO()
+            resized.save(buffer, image_format, quality=QUALITY)
+            path = get_rendition_name(name, size, extension)
+            if default_storage.exists(path):
+                default_storage.delete(path)
+            renditions[size][extension] = default_storage.save(
+                path, ContentFile(buffer.getvalue())
+            )
+    return renditions
+
+
+def update_recipe_renditions(recipe):
+    recipe.image_renditions = (
+        make_renditions(recipe.image.name) if recipe.image else {}
+    )
+    recipe.save(update_fields=['image_renditions', 'updated'])
@@ -0,0 +1,144 @@
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from .feed import drop_author_feed, fan_out_recipe, fill_author_feed
+from .images import update_recipe_renditions
+from .models import Job, Recipe
+from .utils import SHOPPING_LIST_WRITERS, get_shopping_list
+
+TASKS = {}
+
+
+def task(name):
+    def decorator(func):
+        TASKS[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, user=None, **payload):
+    job = Job.objects.create(name=name, payload=payload, user=user,
+                             max_attempts=settings.JOB_MAX_ATTEMPTS)
+    if not settings.BACKGROUND_JOBS:
+        Job.objects.filter(pk=job.pk).update(status=Job.RUNNING,
+                                             attempts=1)
+        job.refresh_from_db()
+        run_job(job, retry=False)
+    return job
+
+
+def claim_jobs(limit):
+    candidates = Job.objects.filter(
+        status=Job.QUEUED, run_at__lte=timezone.now()
+    ).order_by('run_at', 'id').values_list('id', flat=True)[:limit]
+    claimed = []
+    for job_id in candidates:
+        if Job.objects.filter(pk=job_id, status=Job.QUEUED).update(
+                status=Job.RUNNING, attempts=F('attempts') + 1,
+                updated=timezone.now()):
+            claimed.append(job_id)
+    return claimed
+
+
+def requeue_stale_jobs(timeout):
+    return Job.objects.filter(
+        status=Job.RUNNING,
+        updated__lt=timezone.now() - timedelta(seconds=timeout)
+    ).update(status=Job.QUEUED, updated=timezone.now())
+
+
+def get_exports_storage():
+    return FileSystemStorage(location=settings.EXPORTS_ROOT)
+
+
+def get_export_file(job):
+    if job.name != 'export_shopping_list' or job.status != Job.DONE:
+        return None
+    name = (job.result or {}).get('file')
+    storage = get_exports_storage()
+    if not name or not storage.exists(name):
+        return None
+    return name
+
+
+def prune_jobs(days):
+    jobs = Job.objects.filter(
+        status__in=(Job.DONE, Job.FAILED),
+        updated__lt=timezone.now() - timedelta(days=days)
+    )
+    storage = get_exports_storage()
+    for job in jobs.filter(name='export_shopping_list', status=Job.DONE):
+        name = get_export_file(job)
+        if name is not None:
+            storage.delete(name)
+    deleted, _ = jobs.delete()
+    return deleted
+
+
+def run_job(job, retry=True):
+    try:
+        job.result = TASKS[job.name](**job.payload)
+    except Exception:
+        job.error = traceback.format_exc()
+        if not retry or job.attempts >= job.max_attempts:
+            job.status = Job.FAILED
+        else:
+            job.status = Job.QUEUED
+            job.run_at = timezone.now() + timedelta(
+                seconds=settings.JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+            )
+    else:
+        job.status = Job.DONE
+        job.error = ''
+    job.save()
+    return job
+
+
+def execute(job_id):
+    try:
+        return run_job(Job.objects.get(pk=job_id))
+    finally:
+        close_old_connections()
+
+
+@task('make_renditions')
+def make_renditions(recipe_id):
+    recipe = Recipe.objects.filter(pk=recipe_id).first()
+    if recipe is not None:
+        update_recipe_renditions(recipe)
+
+
+@task('fan_out_recipe')
+def fan_out_recipe_task(recipe_id):
+    return {'followers': fan_out_recipe(recipe_id)}
+
+
+@task('fill_author_feed')
+def fill_author_feed_task(author_id):
+    return {'entries': fill_author_feed(author_id)}
+
+
+@task('drop_author_feed')
+def drop_author_feed_task(author_id):
+    return {'entries': drop_author_feed(author_id)}
+
+
+@task('export_shopping_list')
+def export_shopping_list(user_id, file_format):
+    writer = SHOPPING_LIST_WRITERS[file_format]
+    content = b''.join(
+        chunk.encode() if isinstance(chunk, str) else chunk
+        for chunk in writer(get_shopping_list(user_id))
+    )
+    name = get_exports_storage().save(
+        f'{uuid.uuid4().hex}.{file_format}', ContentFile(content)
+    )
+    return {'file': name, 'format': file_format}
@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from ...benchmarks import measure, summarize, write_report
+from ...feed import get_feed_ids, get_joined_feed_ids, rebuild_feeds
+from ...models import AppUser, Subscription
+from .seed_benchmark_data import EMAIL_DOMAIN
+
+MIN_SUBSCRIPTIONS = 10000
+VARIANTS = {
+    'timeline': get_feed_ids,
+    'join': get_joined_feed_ids,
+}
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает чтение ленты подписок из таблицы лент и '
+            'через соединение с подписками.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50,
+                            help='Сколько пользователей читают ленту.')
+        parser.add_argument('--pages', type=int, default=5,
+                            help='Сколько страниц пролистать по ключу.')
+        parser.add_argument('--limit', type=int, default=10)
+        parser.add_argument('--iterations', type=int, default=3)
+        parser.add_argument('--output', default='feed.json')
+
+    def handle(self, *args, **options):
+        subscriptions = Subscription.objects.count()
+        if subscriptions < MIN_SUBSCRIPTIONS:
+            self.stderr.write(self.style.WARNING(
+                f'Подписок всего {subscriptions}, для показательного замера '
+                f'нужно не меньше {MIN_SUBSCRIPTIONS}: запустите '
+                'seed_benchmark_data с большими --users и --subscriptions'
+            ))
+        if not settings.FEED_FANOUT:
+            self.stdout.write(f'FEED_FANOUT выключен, таблица лент '
+                              f'заполнена для замера: {rebuild_feeds()}')
+        users = list(AppUser.objects.filter(
+            email__endswith=EMAIL_DOMAIN
+        ).annotate(
+            subscriptions_count=Count('subscriptions')
+        ).filter(subscriptions_count__gt=0).order_by(
+            '-subscriptions_count', 'id'
+        )[:options['users']])
+        if not users:
+            raise CommandError('Сначала запустите seed_benchmark_data')
+        results = {}
+        mismatches = 0
+        for name, get_ids in VARIANTS.items():
+            timings, queries = [], []
+            for _ in range(options['iterations']):
+                for user in users:
+                    before = None
+                    for _ in range(options['pages']):
+                        recipe_ids, elapsed, count = measure(
+                            get_ids, user, before, options['limit']
+                        )
+                        timings.append(elapsed)
+                        queries.append(count)
+                        if name == 'timeline':
+                            mismatches += recipe_ids != get_joined_feed_ids(
+                                user, before, options['limit']
+                            )
+                        if len(recipe_ids) < options['limit']:
+                            break
+                        before = recipe_ids[-1]
+            results[name] = {'pages': len(timings),
+                             'queries': max(queries),
+                             **summarize(timings)}
+        write_report(options['output'], results,
+                     subscriptions=subscriptions, users=len(users),
+                     limit=options['limit'], mismatches=mismatches)
+        self.stdout.write(f'{"вариант":10} {"страниц":>8} {"запросов":>9} '
+                          f'{"p50":>8} {"p95":>8} {"p99":>8}')
+        for name, row in results.items():
+            self.stdout.write(
+                f'{name:10} {row["pages"]:8} {row["queries"]:9} '
+                f'{row["p50_ms"]:8.2f} {row["p95_ms"]:8.2f} '
+                f'{row["p99_ms"]:8.2f}'
+            )
+        if mismatches:
+            raise CommandError(f'Лента расходится с соединением на '
+                               f'{mismatches} страницах')
+        self.stdout.write(self.style.SUCCESS(
+            f'Результаты записаны в {options["output"]}'
+        ))
@@ -0,0 +1,81 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from ...benchmarks import summarize, write_report
+from ...compression import ENCODINGS
+from ...models import Ingredient
+from ...renderers import FastJSONRenderer, orjson
+from ...serializers import GetRecipeSerializer, IngredientSerializer
+from ...utils import get_recipes_for_read
+
+RENDERERS = {
+    'json': JSONRenderer,
+    'orjson': FastJSONRenderer,
+}
+
+
+def get_payloads(recipes):
+    return {
+        'ingredients': IngredientSerializer(
+            Ingredient.objects.all(), many=True
+        ).data,
+        f'recipes_{recipes}': GetRecipeSerializer(
+            get_recipes_for_read()[:recipes], many=True
+        ).data,
+    }
+
+
+def time_call(func, data, iterations):
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        result = func(data)
+        timings.append(time.perf_counter() - started)
+    return result, summarize(timings)
+
+
+class Command(BaseCommand):
+    help = ('Измеряет время рендеринга JSON и размер ответа со сжатием '
+            'для списка ингредиентов и страницы рецептов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=100)
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--output', default='rendering.json')
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stderr.write(self.style.WARNING(
+                'orjson не установлен, FastJSONRenderer использует json'
+            ))
+        results = {}
+        for name, data in get_payloads(options['recipes']).items():
+            rendered = {}
+            results[name] = {}
+            for renderer_name, renderer in RENDERERS.items():
+                rendered[renderer_name], timings = time_call(
+                    renderer().render, data, options['iterations']
+                )
+                results[name][renderer_name] = {
+                    'bytes': len(rendered[renderer_name]), **timings
+                }
+            if len(set(rendered.values())) != 1:
+                raise CommandError(f'{name}: ответы рендереров различаются')
+            for encoding, compress in ENCODINGS.items():
+                content, timings = time_call(compress, rendered['orjson'],
+                                             options['iterations'])
+                results[name][encoding] = {'bytes': len(content), **timings}
+        write_report(options['output'], results, recipes=options['recipes'])
+        self.stdout.write(f'{"ответ":14} {"вариант":8} {"байт":>9} '
+                          f'{"p50":>8} {"p99":>8}')
+        for name, variants in results.items():
+            for variant, row in variants.items():
+                self.stdout.write(
+                    f'{name:14} {variant:8} {row["bytes"]:9} '
+                    f'{row["p50_ms"]:8.2f} {row["p99_ms"]:8.2f}'
+                )
+        self.stdout.write(self.style.SUCCESS(
+            f'Результаты записаны в {options["output"]}'
+        ))
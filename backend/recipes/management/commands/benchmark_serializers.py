@@ -0,0 +1,82 @@
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from ...benchmarks import measure, summarize, write_report
+from ...fast_serializers import get_recipe_rows, serialize_recipe_rows
+from ...models import AppUser
+from ...renderers import FastJSONRenderer
+from ...serializers import GetRecipeSerializer
+from ...utils import annotate_recipe_flags, get_recipes_for_read
+from .seed_benchmark_data import EMAIL_DOMAIN
+
+
+def render_models(queryset, request):
+    serializer = GetRecipeSerializer(queryset, many=True,
+                                     context={'request': request})
+    return FastJSONRenderer().render(serializer.data)
+
+
+def render_rows(queryset, request):
+    return FastJSONRenderer().render(serialize_recipe_rows(
+        get_recipe_rows(queryset, request.user), request
+    ))
+
+
+VARIANTS = {
+    'serializer': render_models,
+    'values': render_rows,
+}
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает GetRecipeSerializer и быструю сериализацию '
+            'рецептов из values().')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=1000)
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--anonymous', action='store_true')
+        parser.add_argument('--output', default='serializers.json')
+
+    def handle(self, *args, **options):
+        request = Request(APIRequestFactory().get('/api/recipes/'))
+        if not options['anonymous']:
+            user = AppUser.objects.filter(
+                email__endswith=EMAIL_DOMAIN
+            ).order_by('id').first()
+            if user is None:
+                raise CommandError('Сначала запустите seed_benchmark_data')
+            request.user = user
+        queryset = annotate_recipe_flags(
+            get_recipes_for_read(), request.user
+        )[:options['recipes']]
+        contents = {}
+        results = {}
+        for name, render in VARIANTS.items():
+            for _ in range(options['warmup']):
+                render(queryset.all(), request)
+            timings, queries = [], 0
+            for _ in range(options['iterations']):
+                content, elapsed, queries = measure(render, queryset.all(),
+                                                    request)
+                timings.append(elapsed)
+            contents[name] = content
+            results[name] = {'queries': queries, 'bytes': len(content),
+                             **summarize(timings)}
+        identical = len(set(contents.values())) == 1
+        write_report(options['output'], results, recipes=options['recipes'],
+                     anonymous=options['anonymous'], identical=identical)
+        self.stdout.write(f'{"вариант":12} {"запросов":>9} {"p50":>9} '
+                          f'{"p95":>9} {"p99":>9}')
+        for name, row in results.items():
+            self.stdout.write(
+                f'{name:12} {row["queries"]:9} {row["p50_ms"]:9.2f} '
+                f'{row["p95_ms"]:9.2f} {row["p99_ms"]:9.2f}'
+            )
+        if not identical:
+            raise CommandError('Ответы вариантов различаются')
+        self.stdout.write(self.style.SUCCESS(
+            f'Ответы совпадают, результаты записаны в {options["output"]}'
+        ))
@@ -0,0 +1,152 @@
+import http.client
+import itertools
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+
+from ...benchmarks import summarize, write_report
+from ...models import AppUser
+from .seed_benchmark_data import EMAIL_DOMAIN
+
+SERVERS = {
+    'wsgi': (['foodgram.wsgi:application'], 'False'),
+    'asgi': (['foodgram.asgi:application',
+              '--worker-class', 'uvicorn.workers.UvicornWorker'], 'True'),
+}
+DEFAULT_PATHS = (
+    '/api/recipes/',
+    '/api/recipes/?limit=20',
+    '/api/users/subscriptions/?recipes_limit=3',
+    '/api/tags/',
+    '/api/ingredients/',
+)
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает пропускную способность синхронного WSGI и '
+            'асинхронного ASGI сервера на тестовых данных.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--concurrency', type=int, default=64)
+        parser.add_argument('--requests', type=int, default=2000,
+                            help='Число запросов к каждому маршруту.')
+        parser.add_argument('--port', type=int, default=8101)
+        parser.add_argument('--paths', nargs='+', default=DEFAULT_PATHS)
+        parser.add_argument('--startup-timeout', type=float, default=30)
+        parser.add_argument('--output', default='throughput.json')
+
+    def handle(self, *args, **options):
+        user = AppUser.objects.filter(
+            email__endswith=EMAIL_DOMAIN
+        ).order_by('id').first()
+        if user is None:
+            raise CommandError('Сначала запустите seed_benchmark_data')
+        token, _ = Token.objects.get_or_create(user=user)
+        self.headers = {'Authorization': f'Token {token.key}'}
+        self.port = options['port']
+        results = {}
+        for mode, (arguments, async_views) in SERVERS.items():
+            server = self.start_server(arguments, async_views,
+                                       options['workers'],
+                                       options['startup_timeout'])
+            try:
+                results[mode] = {
+                    path: self.load(path, options['requests'],
+                                    options['concurrency'])
+                    for path in options['paths']
+                }
+            finally:
+                server.terminate()
+                server.wait()
+        write_report(options['output'], results,
+                     workers=options['workers'],
+                     concurrency=options['concurrency'])
+        self.print_results(results)
+        self.stdout.write(self.style.SUCCESS(
+            f'Результаты записаны в {options["output"]}'
+        ))
+
+    def start_server(self, arguments, async_views, workers, timeout):
+        env = {**os.environ, 'ASYNC_VIEWS': async_views}
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn.app.wsgiapp', *arguments,
+             '--config', 'gunicorn.conf.py',
+             '--workers', str(workers),
+             '--bind', f'127.0.0.1:{self.port}'],
+            cwd=settings.BASE_DIR, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+        )
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(server.stderr.read().decode())
+            connection = self.connect()
+            try:
+                if self.request(connection, '/api/tags/') == 200:
+                    return server
+            except (OSError, http.client.HTTPException):
+                time.sleep(0.2)
+            finally:
+                connection.close()
+        server.terminate()
+        raise CommandError('Сервер не запустился')
+
+    def connect(self):
+        return http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+
+    def request(self, connection, path):
+        connection.request('GET', path, headers=self.headers)
+        response = connection.getresponse()
+        response.read()
+        return response.status
+
+    def load(self, path, total, concurrency):
+        counter = itertools.count()
+        lock = threading.Lock()
+        timings = []
+        errors = 0
+
+        def worker():
+            nonlocal errors
+            connection = self.connect()
+            while next(counter) < total:
+                started = time.perf_counter()
+                try:
+                    failed = self.request(connection, path) >= 400
+                except (OSError, http.client.HTTPException):
+                    connection.close()
+                    connection = self.connect()
+                    failed = True
+                elapsed = time.perf_counter() - started
+                with lock:
+                    timings.append(elapsed)
+                    errors += failed
+            connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for _ in range(concurrency):
+                pool.submit(worker)
+        duration = time.perf_counter() - started
+        return {'requests': len(timings), 'errors': errors,
+                'rps': round(len(timings) / duration, 1),
+                **summarize(timings)}
+
+    def print_results(self, results):
+        self.stdout.write(f'{"режим":6} {"маршрут":45} {"rps":>8} '
+                          f'{"p50":>8} {"p99":>8} {"ошибки":>7}')
+        for mode, paths in results.items():
+            for path, row in paths.items():
+                self.stdout.write(
+                    f'{mode:6} {path:45} {row["rps"]:8.1f} '
+                    f'{row["p50_ms"]:8.2f} {row["p99_ms"]:8.2f} '
+                    f'{row["errors"]:7}'
+                )
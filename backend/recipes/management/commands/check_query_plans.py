@@ -0,0 +1,136 @@
+import re
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from ...models import (CartTotal, FeedEntry, Favorite, Ingredient, Recipe,
+                       RecipeIngredient, ShoppingList, Subscription, Tag)
+
+MIN_ROWS = 1000
+PREFIX = 'мол'
+SUBSTRING = 'оло'
+SQLITE_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\w+)')
+POSTGRESQL_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+def first_value(queryset, field, default=0):
+    value = queryset.values_list(field, flat=True).first()
+    return default if value is None else value
+
+
+def get_queries():
+    user_id = first_value(Favorite.objects.order_by('id'), 'user_id')
+    author_id = first_value(Recipe.objects.order_by('id'), 'author_id')
+    recipe_id = first_value(Recipe.objects.order_by('id'), 'id')
+    slug = first_value(Tag.objects.order_by('id'), 'slug', '')
+    queries = {
+        'рецепты по тегу': Recipe.objects.filter(tags__slug=slug),
+        'рецепты автора': Recipe.objects.filter(
+            author_id=author_id
+        ).order_by('-id'),
+        'тег по slug': Tag.objects.filter(slug=slug),
+        'ингредиенты рецепта': RecipeIngredient.objects.filter(
+            recipe_id=recipe_id
+        ),
+        'избранное пользователя': Favorite.objects.filter(user_id=user_id),
+        'корзина пользователя': ShoppingList.objects.filter(user_id=user_id),
+        'итоги корзины': CartTotal.objects.filter(user_id=user_id),
+        'подписки пользователя': Subscription.objects.filter(user_id=user_id),
+        'подписчики автора': Subscription.objects.filter(
+            author_id=author_id
+        ),
+        'лента пользователя': FeedEntry.objects.filter(
+            user_id=user_id, recipe_id__lt=recipe_id + 1000
+        ).order_by('-recipe_id'),
+    }
+    if connection.vendor == 'postgresql':
+        table = Ingredient._meta.db_table
+        queries['ингредиенты по префиксу'] = Ingredient.objects.filter(
+            name__startswith=PREFIX
+        )
+        queries['ингредиенты по подстроке'] = (
+            f'SELECT id, name FROM {table} WHERE name ILIKE %s',
+            [f'%{SUBSTRING}%'],
+        )
+        queries['похожие ингредиенты'] = (
+            f'SELECT id, name FROM {table} WHERE name %% %s',
+            [SUBSTRING],
+        )
+    return queries
+
+
+def explain(query):
+    if not isinstance(query, tuple):
+        return query.explain()
+    sql, params = query
+    prefix = connection.ops.explain_query_prefix()
+    with connection.cursor() as cursor:
+        cursor.execute(f'{prefix} {sql}', params)
+        return '\n'.join(' '.join(map(str, row)) for row in cursor.fetchall())
+
+
+def get_row_counts():
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return {
+        model._meta.db_table: model.objects.count()
+        for model in apps.get_app_config('recipes').get_models(
+            include_auto_created=True
+        )
+    }
+
+
+def get_full_scans(plan):
+    if connection.vendor == 'postgresql':
+        return POSTGRESQL_SCAN.findall(plan)
+    return [
+        table
+        for line in plan.splitlines() if 'USING' not in line
+        for table in SQLITE_SCAN.findall(line)
+    ]
+
+
+class Command(BaseCommand):
+    help = ('Проверяет через EXPLAIN, что частые запросы '
+            'используют индексы.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-rows', type=int, default=MIN_ROWS,
+            help='Таблицы меньше этого размера можно просматривать целиком.'
+        )
+
+    def handle(self, *args, **options):
+        row_counts = get_row_counts()
+        large_tables = {
+            table for table, count in row_counts.items()
+            if count >= options['min_rows']
+        }
+        if not large_tables:
+            raise CommandError(
+                f'Нет таблиц от {options["min_rows"]} строк: планировщик '
+                'просматривает маленькие таблицы целиком. Заполните базу '
+                'командой seed_benchmark_data.'
+            )
+        failures = []
+        for title, query in get_queries().items():
+            plan = explain(query)
+            scans = set(get_full_scans(plan))
+            if scans & large_tables:
+                failures.append(title)
+                self.stdout.write(self.style.ERROR(f'{title}:\n{plan}'))
+            elif scans:
+                skipped = ', '.join(
+                    f'{table} ({row_counts.get(table, 0)})'
+                    for table in sorted(scans)
+                )
+                self.stdout.write(f'{title}: OK, маленькие таблицы: '
+                                  f'{skipped}')
+            else:
+                self.stdout.write(f'{title}: OK')
+        if failures:
+            raise CommandError(
+                'Полный просмотр таблицы: ' + ', '.join(failures)
+            )
+        self.stdout.write(self.style.SUCCESS('Все запросы используют индексы'))
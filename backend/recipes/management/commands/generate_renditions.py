@@ -0,0 +1,52 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from ...cache import bump_version
+from ...images import make_renditions
+from ...models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Создаёт уменьшенные изображения для существующих рецептов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересоздать изображения и для уже обработанных рецептов.'
+        )
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.exclude(image='').exclude(image=None)
+        if not options['force']:
+            recipes = recipes.filter(image_renditions={})
+        images = dict(recipes.values_list('id', 'image'))
+        connections.close_all()
+        done = failed = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            futures = {
+                pool.submit(make_renditions, name): recipe_id
+                for recipe_id, name in images.items()
+            }
+            for future in as_completed(futures):
+                recipe_id = futures[future]
+                try:
+                    renditions = future.result()
+                except Exception as error:
+                    failed += 1
+                    self.stderr.write(f'Рецепт {recipe_id}: {error}')
+                    continue
+                Recipe.objects.filter(pk=recipe_id).update(
+                    image_renditions=renditions, updated=timezone.now()
+                )
+                done += 1
+        if done:
+            bump_version('recipes')
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано: {done}, ошибок: {failed}'
+        ))
@@ -1,16 +1,117 @@
 import csv
+import json
+import os
+import time
+from itertools import islice
 
-from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 
+from ...cache import bump_version
 from ...models import Ingredient
 
+DEFAULT_PATH = os.path.join(settings.BASE_DIR, 'recipes', 'data',
+                            'ingredients.csv')
+
+
+JSON_CHUNK_SIZE = 64 * 1024
+JSON_SEPARATORS = ' \t\r\n,'
+
+
+def read_json_array(file, chunk_size=JSON_CHUNK_SIZE):
+    decoder = json.JSONDecoder()
+    buffer = file.read(chunk_size).lstrip()
+    if not buffer.startswith('['):
+        raise CommandError('JSON файл должен содержать список')
+    position, eof = 1, False
+    while True:
+        while position < len(buffer) and buffer[position] in JSON_SEPARATORS:
+            position += 1
+        if buffer.startswith(']', position):
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            end = None
+        if end is None or (end == len(buffer) and not eof):
+            if eof:
+                raise CommandError('JSON файл обрезан или поврежден')
+            chunk = file.read(chunk_size)
+            eof = not chunk
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+        yield item
+        position = end
+
 
 class Command(BaseCommand):
+    help = 'Загружает ингредиенты из CSV или JSON файла.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default=DEFAULT_PATH)
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Посчитать новые строки, ничего не записывая.'
+        )
+
     def handle(self, *args, **options):
-        with open('recipes/data/ingredients.csv', encoding='UTF-8') as file:
-            file_reader = csv.reader(file)
-            for row in file_reader:
-                name, unit = row
-                Ingredient.objects.get_or_create(
-                    name=name, measurement_unit=unit
-                )
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'Файл {path} не найден')
+        self.total = self.inserted = 0
+        self.planned = set()
+        self.started = time.monotonic()
+        if options['dry_run']:
+            self.load(path, options['batch_size'], dry_run=True)
+        else:
+            with transaction.atomic():
+                self.load(path, options['batch_size'])
+            bump_version('ingredients')
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(self.style.SUCCESS(
+            f'Прочитано: {self.total}, добавлено: {self.inserted}, '
+            f'пропущено: {self.total - self.inserted} '
+            f'за {elapsed:.2f} с'
+            + (' (пробный запуск)' if options['dry_run'] else '')
+        ))
+
+    def load(self, path, batch_size, dry_run=False):
+        rows = self.read_rows(path)
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return
+            self.total += len(batch)
+            self.inserted += self.insert_batch(batch, dry_run)
+            elapsed = max(time.monotonic() - self.started, 1e-6)
+            self.stdout.write(
+                f'{self.total} строк, {self.total / elapsed:.0f} строк/с'
+            )
+
+    def read_rows(self, path):
+        with open(path, encoding='UTF-8') as file:
+            if path.endswith('.json'):
+                for item in read_json_array(file):
+                    yield item['name'], item['measurement_unit']
+                return
+            for name, unit in csv.reader(file):
+                yield name, unit
+
+    def insert_batch(self, batch, dry_run=False):
+        existing = set(Ingredient.objects.filter(
+            name__in={name for name, _ in batch}
+        ).values_list('name', 'measurement_unit'))
+        new = [row for row in dict.fromkeys(batch)
+               if row not in existing and row not in self.planned]
+        if dry_run:
+            self.planned.update(new)
+            return len(new)
+        Ingredient.objects.bulk_create(
+            (Ingredient(name=name, measurement_unit=unit)
+             for name, unit in new),
+            ignore_conflicts=True
+        )
+        return len(new)
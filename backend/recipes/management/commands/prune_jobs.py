@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...jobs import prune_jobs
+
+
+class Command(BaseCommand):
+    help = 'Удаляет выполненные и упавшие фоновые задачи старше N дней.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int,
+                            default=settings.JOB_RETENTION_DAYS)
+
+    def handle(self, *args, **options):
+        deleted = prune_jobs(options['days'])
+        self.stdout.write(self.style.SUCCESS(f'Удалено задач: {deleted}'))
@@ -0,0 +1,64 @@
+import math
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from ...models import CartTotal
+from ...utils import get_expected_cart_totals
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает таблицу итогов списков покупок и сверяет её.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Только сверить таблицу, ничего не меняя.'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if not options['verify']:
+            self.rebuild(options['batch_size'])
+        drift = self.find_drift()
+        if drift:
+            for key, (actual, expected) in drift[:20]:
+                self.stderr.write(
+                    f'user={key[0]} ingredient={key[1]}: '
+                    f'{actual} != {expected}'
+                )
+            raise CommandError(f'Расхождений: {len(drift)}')
+        self.stdout.write(self.style.SUCCESS('Итоги списков покупок верны'))
+
+    def rebuild(self, batch_size):
+        expected = get_expected_cart_totals()
+        with transaction.atomic():
+            CartTotal.objects.all().delete()
+            CartTotal.objects.bulk_create(
+                (CartTotal(user_id=user_id, ingredient_id=ingredient_id,
+                           amount=amount, recipes_count=entries)
+                 for (user_id, ingredient_id), (amount, entries)
+                 in expected.items()),
+                batch_size=batch_size
+            )
+        self.stdout.write(f'Записано строк: {len(expected)}')
+
+    def find_drift(self):
+        expected = get_expected_cart_totals()
+        actual = {
+            (user_id, ingredient_id): (amount, entries)
+            for user_id, ingredient_id, amount, entries
+            in CartTotal.objects.values_list(
+                'user', 'ingredient', 'amount', 'recipes_count'
+            ).iterator()
+        }
+        drift = []
+        for key in actual.keys() | expected.keys():
+            actual_row = actual.get(key, (0, 0))
+            expected_row = expected.get(key, (0, 0))
+            if (actual_row[1] != expected_row[1]
+                    or not math.isclose(actual_row[0], expected_row[0],
+                                        abs_tol=1e-6)):
+                drift.append((key, (actual_row, expected_row)))
+        return drift
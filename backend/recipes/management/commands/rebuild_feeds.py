@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from ...feed import rebuild_feeds
+
+
+class Command(BaseCommand):
+    help = ('Заново заполняет таблицу лент подписок. Нужна после '
+            'включения FEED_FANOUT.')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS(
+            f'Записей в лентах: {rebuild_feeds()}'
+        ))
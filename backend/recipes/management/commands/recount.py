@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from ...models import AppUser, Favorite, Recipe, Subscription
+
+COUNTERS = (
+    (Recipe, 'favorites_count', Favorite, 'recipe'),
+    (AppUser, 'followers_count', Subscription, 'author'),
+    (AppUser, 'recipes_count', Recipe, 'author'),
+)
+
+
+def find_drift(model, field, related, key, rows):
+    actual = dict(
+        related.objects.filter(**{f'{key}__in': [pk for pk, _ in rows]})
+        .order_by().values(key).annotate(total=Count('id'))
+        .values_list(key, 'total')
+    )
+    return [(pk, stored, actual.get(pk, 0)) for pk, stored in rows
+            if stored != actual.get(pk, 0)]
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает счётчики избранного, подписчиков и рецептов '
+            'и исправляет расхождения.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Только найти расхождения, ничего не меняя.'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = 0
+        for model, field, related, key in COUNTERS:
+            drift = self.recount(model, field, related, key,
+                                 options['batch_size'], options['verify'])
+            total += drift
+            self.stdout.write(
+                f'{model._meta.model_name}.{field}: расхождений {drift}'
+            )
+        if options['verify'] and total:
+            raise CommandError(f'Расхождений: {total}')
+        self.stdout.write(self.style.SUCCESS('Счётчики верны'))
+
+    def recount(self, model, field, related, key, batch_size, verify):
+        drift = 0
+        last_pk = 0
+        while True:
+            rows = list(model.objects.filter(pk__gt=last_pk).order_by(
+                'pk'
+            ).values_list('pk', field)[:batch_size])
+            if not rows:
+                return drift
+            last_pk = rows[-1][0]
+            for pk, stored, actual in find_drift(model, field, related, key,
+                                                 rows):
+                if verify:
+                    self.stderr.write(f'{model._meta.model_name}={pk} '
+                                      f'{field}: {stored} != {actual}')
+                else:
+                    model.objects.filter(pk=pk, **{field: stored}).update(
+                        **{field: actual}
+                    )
+                drift += 1
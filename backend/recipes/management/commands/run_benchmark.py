@@ -0,0 +1,216 @@
+import base64
+import io
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from PIL import Image
+from rest_framework.authtoken.models import Token
+
+from ...benchmarks import load_report, measure, summarize, write_report
+from ...models import AppUser, Ingredient, Job, Recipe, Tag
+from .seed_benchmark_data import EMAIL_DOMAIN, PASSWORD
+
+REGISTERED_EMAIL = 'benchmark-signup-{}' + EMAIL_DOMAIN
+
+
+def get_image():
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 64), 'orange').save(buffer, 'PNG')
+    encoded = base64.b64encode(buffer.getvalue()).decode()
+    return f'data:image/png;base64,{encoded}'
+
+
+def get_content(response):
+    if response.streaming:
+        return b''.join(response.streaming_content)
+    return response.content
+
+
+class Command(BaseCommand):
+    help = ('Замеряет время ответа и число запросов к базе '
+            'для каждого маршрута API.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--output', default='benchmark.json')
+        parser.add_argument('--compare',
+                            help='JSON файл предыдущего замера.')
+        parser.add_argument('--only',
+                            help='Замерять только маршруты с этой подстрокой.')
+
+    def handle(self, *args, **options):
+        user = AppUser.objects.filter(
+            email__endswith=EMAIL_DOMAIN
+        ).order_by('id').first()
+        if user is None:
+            raise CommandError('Сначала запустите seed_benchmark_data')
+        token, _ = Token.objects.get_or_create(user=user)
+        self.anonymous = Client()
+        self.client = Client(HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.signups = 0
+        scenarios = self.get_scenarios(user)
+        if options['only']:
+            scenarios = [
+                steps for steps in scenarios
+                if any(options['only'] in step[0] for step in steps)
+            ]
+        results = {}
+        try:
+            for steps in scenarios:
+                self.run_scenario(steps, options['warmup'],
+                                  options['iterations'], results)
+        finally:
+            AppUser.objects.filter(
+                email__startswith='benchmark-signup-'
+            ).delete()
+        write_report(options['output'], results,
+                     iterations=options['iterations'])
+        previous = load_report(options['compare']) if options[
+            'compare'] else {}
+        self.print_results(results, previous)
+        self.stdout.write(self.style.SUCCESS(
+            f'Результаты записаны в {options["output"]}'
+        ))
+
+    def get_scenarios(self, user):
+        recipe = Recipe.objects.filter(author=user).first()
+        other = Recipe.objects.exclude(author=user).exclude(
+            in_favorite__user=user
+        ).exclude(recipes_in__user=user).first()
+        author = AppUser.objects.exclude(pk=user.pk).exclude(
+            subscriptors__user=user
+        ).order_by('id').first()
+        bulk = {'recipes': list(Recipe.objects.exclude(
+            in_favorite__user=user
+        ).exclude(recipes_in__user=user).values_list('id', flat=True)[:10])}
+        tag = Tag.objects.first()
+        ingredients = list(Ingredient.objects.values_list('id', flat=True)[:3])
+        job = Job.objects.filter(user=user).first() or Job.objects.create(
+            name='export_shopping_list', user=user, status=Job.DONE
+        )
+        new_recipe = {
+            'name': 'Замер', 'text': 'Замер', 'cooking_time': 10,
+            'tags': [tag.id], 'image': get_image(),
+            'ingredients': [{'id': pk, 'amount': 100} for pk in ingredients],
+        }
+        created = lambda response: f'/api/recipes/{response.json()["id"]}/'
+        return [
+            [('GET recipes', 'get', '/api/recipes/', None)],
+            [('GET recipes (anonymous)', 'get', '/api/recipes/', None,
+              True)],
+            [('GET recipes?tags', 'get',
+              f'/api/recipes/?tags={tag.slug}', None)],
+            [('GET recipes?is_favorited', 'get',
+              '/api/recipes/?is_favorited=1', None)],
+            [('GET recipes/{id}', 'get', f'/api/recipes/{recipe.id}/',
+              None)],
+            [('POST recipes', 'post', '/api/recipes/', new_recipe),
+             ('PATCH recipes/{id}', 'patch', created,
+              {**new_recipe, 'name': 'Замер 2'}),
+             ('DELETE recipes/{id}', 'delete', created, None)],
+            [('GET recipes/{id}/favorite', 'get',
+              f'/api/recipes/{other.id}/favorite/', None),
+             ('DELETE recipes/{id}/favorite', 'delete',
+              f'/api/recipes/{other.id}/favorite/', None)],
+            [('GET recipes/{id}/shopping_cart', 'get',
+              f'/api/recipes/{other.id}/shopping_cart/', None),
+             ('DELETE recipes/{id}/shopping_cart', 'delete',
+              f'/api/recipes/{other.id}/shopping_cart/', None)],
+            [('POST recipes/favorite (bulk)', 'post',
+              '/api/recipes/favorite/', bulk),
+             ('DELETE recipes/favorite (bulk)', 'delete',
+              '/api/recipes/favorite/', bulk)],
+            [('POST recipes/shopping_cart (bulk)', 'post',
+              '/api/recipes/shopping_cart/', bulk),
+             ('DELETE recipes/shopping_cart (bulk)', 'delete',
+              '/api/recipes/shopping_cart/', bulk)],
+            [('GET recipes/feed', 'get', '/api/recipes/feed/', None)],
+            [('GET recipes/feed?limit=50', 'get',
+              '/api/recipes/feed/?limit=50', None)],
+            [('GET recipes/download_shopping_cart', 'get',
+              '/api/recipes/download_shopping_cart/?format=txt', None)],
+            [('GET recipes/download_shopping_cart (pdf)', 'get',
+              '/api/recipes/download_shopping_cart/?format=pdf', None)],
+            [('GET recipes/shopping_cart_summary', 'get',
+              '/api/recipes/shopping_cart_summary/', None)],
+            [('POST recipes/shopping_cart_export', 'post',
+              '/api/recipes/shopping_cart_export/', {'format': 'csv'})],
+            [('GET tags', 'get', '/api/tags/', None)],
+            [('GET tags/{id}', 'get', f'/api/tags/{tag.id}/', None)],
+            [('GET ingredients', 'get', '/api/ingredients/', None)],
+            [('GET ingredients?name', 'get',
+              '/api/ingredients/?name=%D0%B8%D0%BD', None)],
+            [('GET ingredients/{id}', 'get',
+              f'/api/ingredients/{ingredients[0]}/', None)],
+            [('GET users', 'get', '/api/users/', None)],
+            [('GET users/{id}', 'get', f'/api/users/{author.id}/', None)],
+            [('GET users/me', 'get', '/api/users/me/', None)],
+            [('POST users', 'post', '/api/users/', self.get_signup)],
+            [('GET users/subscriptions', 'get',
+              '/api/users/subscriptions/?recipes_limit=3', None)],
+            [('GET users/{id}/subscribe', 'get',
+              f'/api/users/{author.id}/subscribe/', None),
+             ('DELETE users/{id}/subscribe', 'delete',
+              f'/api/users/{author.id}/subscribe/', None)],
+            [('POST auth/token/login', 'post', '/api/auth/token/login/',
+              {'email': user.email, 'password': PASSWORD})],
+            [('GET jobs', 'get', '/api/jobs/', None)],
+            [('GET jobs/{id}', 'get', f'/api/jobs/{job.id}/', None)],
+            [('GET metrics', 'get', '/api/metrics/', None)],
+        ]
+
+    def get_signup(self):
+        self.signups += 1
+        email = REGISTERED_EMAIL.format(self.signups)
+        return {'email': email, 'username': f'signup{self.signups}',
+                'first_name': 'Замер', 'last_name': 'Замер',
+                'password': 'Benchmark-Pa55word'}
+
+    def request(self, method, url, data, anonymous):
+        client = self.anonymous if anonymous else self.client
+        if data is None:
+            response = getattr(client, method)(url)
+        else:
+            response = getattr(client, method)(
+                url, data, content_type='application/json'
+            )
+        get_content(response)
+        return response
+
+    def run_scenario(self, steps, warmup, iterations, results):
+        timings = {step[0]: [] for step in steps}
+        for iteration in range(warmup + iterations):
+            previous = None
+            for label, method, url, data, *anonymous in steps:
+                if callable(url):
+                    url = url(previous)
+                if callable(data):
+                    data = data()
+                previous, elapsed, queries = measure(
+                    self.request, method, url, data, bool(anonymous)
+                )
+                if previous.status_code >= 400:
+                    raise CommandError(
+                        f'{label}: {previous.status_code} {previous.content}'
+                    )
+                if iteration >= warmup:
+                    timings[label].append(elapsed)
+                    results[label] = {'path': url,
+                                      'status': previous.status_code,
+                                      'queries': queries}
+        for label, values in timings.items():
+            results[label].update(summarize(values))
+
+    def print_results(self, results, previous):
+        self.stdout.write(f'{"маршрут":45} {"p50":>8} {"p95":>8} '
+                          f'{"p99":>8} {"запросы":>8}')
+        for label, row in results.items():
+            line = (f'{label:45} {row["p50_ms"]:8.2f} {row["p95_ms"]:8.2f} '
+                    f'{row["p99_ms"]:8.2f} {row["queries"]:8}')
+            before = previous.get(label)
+            if before:
+                change = row['p95_ms'] - before['p95_ms']
+                line += (f'  p95 {change:+.2f} мс, запросы '
+                         f'{row["queries"] - before["queries"]:+}')
+            self.stdout.write(line)
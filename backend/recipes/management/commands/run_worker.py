@@ -0,0 +1,70 @@
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...jobs import claim_jobs, execute, prune_jobs, requeue_stale_jobs
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди в базе данных.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            default=600,
+            help='Через сколько секунд вернуть зависшие задачи в очередь.'
+        )
+        parser.add_argument(
+            '--prune-interval',
+            type=int,
+            default=3600,
+            help='Как часто в секундах удалять старые завершённые задачи.'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Выполнить доступные задачи и завершиться.'
+        )
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        requeued = requeue_stale_jobs(options['stale_after'])
+        if requeued:
+            self.stdout.write(f'Возвращено в очередь: {requeued}')
+        concurrency = options['concurrency']
+        running = set()
+        pruned_at = None
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            while not self.stopping:
+                if (pruned_at is None or time.monotonic() - pruned_at
+                        >= options['prune_interval']):
+                    self.prune()
+                    pruned_at = time.monotonic()
+                running = {future for future in running if not future.done()}
+                job_ids = claim_jobs(concurrency - len(running))
+                for job_id in job_ids:
+                    running.add(pool.submit(self.run, job_id))
+                if options['once'] and not job_ids and not running:
+                    break
+                if not job_ids:
+                    time.sleep(options['poll_interval'])
+
+    def prune(self):
+        deleted = prune_jobs(settings.JOB_RETENTION_DAYS)
+        if deleted:
+            self.stdout.write(f'Удалено старых задач: {deleted}')
+
+    def run(self, job_id):
+        job = execute(job_id)
+        self.stdout.write(f'{job}: {job.get_status_display()}')
+
+    def stop(self, signum, frame):
+        self.stopping = True
@@ -0,0 +1,165 @@
+import random
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ...cache import bump_version
+from ...feed import rebuild_feeds
+from ...models import (AppUser, Favorite, Ingredient, Recipe,
+                       RecipeIngredient, ShoppingList, Subscription, Tag)
+from ...search import update_search_index
+
+EMAIL_DOMAIN = '@bench.local'
+TAG_PREFIX = 'bench-'
+PASSWORD = 'benchmark'
+
+
+def zipf_weights(size, exponent=1.1):
+    return [1 / (rank + 1) ** exponent for rank in range(size)]
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу синтетическими пользователями и рецептами '
+            'для замеров производительности.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--recipes', type=int, default=2000)
+        parser.add_argument('--tags', type=int, default=12)
+        parser.add_argument('--ingredients-per-recipe', type=int, default=6)
+        parser.add_argument('--favorites', type=int, default=20,
+                            help='Среднее число избранных на пользователя.')
+        parser.add_argument('--cart', type=int, default=4,
+                            help='Среднее число рецептов в корзине.')
+        parser.add_argument('--subscriptions', type=int, default=8,
+                            help='Среднее число подписок на пользователя.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Удалить ранее созданные тестовые данные.'
+        )
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        with transaction.atomic():
+            if options['clear']:
+                self.clear()
+            users = self.create_users(options['users'])
+            tags = self.create_tags(options['tags'])
+            ingredients = self.get_ingredients()
+            recipes = self.create_recipes(users, options['recipes'])
+            update_search_index(recipes)
+            self.fill_recipes(recipes, tags, ingredients,
+                              options['ingredients_per_recipe'])
+            self.fill_relations(Favorite, 'recipe_id', users, recipes,
+                                options['favorites'])
+            self.fill_relations(ShoppingList, 'recipe_id', users, recipes,
+                                options['cart'])
+            self.fill_relations(Subscription, 'author_id', users, users,
+                                options['subscriptions'])
+        call_command('rebuild_cart_totals', stdout=self.stdout)
+        call_command('recount', stdout=self.stdout)
+        if settings.FEED_FANOUT:
+            self.stdout.write(f'Записей в лентах: {rebuild_feeds()}')
+        for resource in ('recipes', 'tags', 'ingredients', 'users'):
+            bump_version(resource)
+        self.stdout.write(self.style.SUCCESS(
+            f'Пользователей: {len(users)}, рецептов: {len(recipes)}, '
+            f'пароль: {PASSWORD}'
+        ))
+
+    def clear(self):
+        AppUser.objects.filter(email__endswith=EMAIL_DOMAIN).delete()
+        Tag.objects.filter(slug__startswith=TAG_PREFIX).delete()
+
+    def create_users(self, count):
+        start = AppUser.objects.filter(email__endswith=EMAIL_DOMAIN).count()
+        password = make_password(PASSWORD)
+        AppUser.objects.bulk_create(
+            (AppUser(email=f'bench{number}{EMAIL_DOMAIN}',
+                     username=f'bench{number}',
+                     first_name='Бенчмарк', last_name=str(number),
+                     password=password)
+             for number in range(start, start + count)),
+            batch_size=self.batch_size
+        )
+        return list(AppUser.objects.filter(
+            email__endswith=EMAIL_DOMAIN
+        ).order_by('id').values_list('id', flat=True)[start:])
+
+    def create_tags(self, count):
+        Tag.objects.bulk_create(
+            (Tag(name=f'Тег {number}', slug=f'{TAG_PREFIX}{number}',
+                 color=f'#{self.random.randrange(0x1000000):06x}')
+             for number in range(count)),
+            ignore_conflicts=True
+        )
+        return list(Tag.objects.filter(
+            slug__startswith=TAG_PREFIX
+        ).values_list('id', flat=True))
+
+    def get_ingredients(self):
+        if Ingredient.objects.count() < 100:
+            Ingredient.objects.bulk_create(
+                (Ingredient(name=f'ингредиент {number}',
+                            measurement_unit='г')
+                 for number in range(500)),
+                ignore_conflicts=True
+            )
+        return list(Ingredient.objects.values_list('id', flat=True))
+
+    def create_recipes(self, users, count):
+        last_id = Recipe.objects.order_by('-id').values_list(
+            'id', flat=True
+        ).first() or 0
+        authors = self.random.choices(users, zipf_weights(len(users)),
+                                      k=count)
+        Recipe.objects.bulk_create(
+            (Recipe(author_id=author_id, name=f'Рецепт {number}',
+                    text='Описание рецепта ' * 20,
+                    cooking_time=self.random.randint(5, 180))
+             for number, author_id in enumerate(authors)),
+            batch_size=self.batch_size
+        )
+        return list(Recipe.objects.filter(
+            id__gt=last_id, author_id__in=users
+        ).order_by('id').values_list('id', flat=True))
+
+    def fill_recipes(self, recipes, tags, ingredients, per_recipe):
+        tag_links = []
+        amounts = []
+        for recipe_id in recipes:
+            for tag_id in self.random.sample(
+                    tags, min(len(tags), self.random.randint(1, 3))):
+                tag_links.append(Recipe.tags.through(recipe_id=recipe_id,
+                                                     tag_id=tag_id))
+            size = min(len(ingredients),
+                       self.random.randint(1, per_recipe * 2 - 1))
+            for ingredient_id in self.random.sample(ingredients, size):
+                amounts.append(RecipeIngredient(
+                    recipe_id=recipe_id, ingredient_id=ingredient_id,
+                    amount=self.random.randint(1, 50) * 10
+                ))
+        Recipe.tags.through.objects.bulk_create(tag_links,
+                                                batch_size=self.batch_size)
+        RecipeIngredient.objects.bulk_create(amounts,
+                                             batch_size=self.batch_size)
+
+    def fill_relations(self, model, target, users, targets, average):
+        weights = zipf_weights(len(targets))
+        rows = []
+        for user_id in users:
+            size = self.random.randint(0, average * 2)
+            chosen = set(self.random.choices(targets, weights, k=size))
+            if target == 'author_id':
+                chosen.discard(user_id)
+            rows.extend(model(user_id=user_id, **{target: target_id})
+                        for target_id in chosen)
+        model.objects.bulk_create(rows, batch_size=self.batch_size,
+                                  ignore_conflicts=True)
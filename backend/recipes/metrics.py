@@ -0,0 +1,130 @@
+import asyncio
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from prometheus_client import (REGISTRY, CollectorRegistry, Counter,
+                               Histogram, generate_latest, multiprocess)
+
+LABELS = ('view', 'method')
+
+REQUESTS = Counter('foodgram_requests', 'Число запросов',
+                   LABELS + ('status',))
+REQUEST_LATENCY = Histogram('foodgram_request_latency_seconds',
+                            'Время ответа', LABELS)
+DB_QUERIES = Histogram(
+    'foodgram_db_queries', 'Число запросов к базе за один ответ', LABELS,
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, float('inf'))
+)
+DB_TIME = Histogram('foodgram_db_time_seconds',
+                    'Время запросов к базе за один ответ', LABELS)
+RESPONSE_SIZE = Histogram(
+    'foodgram_response_size_bytes', 'Размер ответа', LABELS,
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, float('inf'))
+)
+
+
+class QueryTimer:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                self.count += 1
+                self.duration += elapsed
+
+
+current_timer = ContextVar('current_timer', default=None)
+
+
+def time_query(execute, sql, params, many, context):
+    timer = current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+def track_queries(connection):
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+@receiver(connection_created)
+def track_new_connection(sender, connection, **kwargs):
+    track_queries(connection)
+
+
+def count_stream(content, labels):
+    size = 0
+    for chunk in content:
+        size += len(chunk)
+        yield chunk
+    RESPONSE_SIZE.labels(*labels).observe(size)
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.acall(request)
+        track_queries(connection)
+        timer = QueryTimer()
+        token = current_timer.set(timer)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timer.reset(token)
+        self.record(request, response, time.perf_counter() - started, timer)
+        return response
+
+    async def acall(self, request):
+        timer = QueryTimer()
+        token = current_timer.set(timer)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timer.reset(token)
+        self.record(request, response, time.perf_counter() - started, timer)
+        return response
+
+    def record(self, request, response, elapsed, timer):
+        match = request.resolver_match
+        labels = (match.view_name if match else 'unresolved', request.method)
+        REQUESTS.labels(*labels, response.status_code).inc()
+        REQUEST_LATENCY.labels(*labels).observe(elapsed)
+        DB_QUERIES.labels(*labels).observe(timer.count)
+        DB_TIME.labels(*labels).observe(timer.duration)
+        if response.streaming:
+            response.streaming_content = count_stream(
+                response.streaming_content, labels
+            )
+        else:
+            RESPONSE_SIZE.labels(*labels).observe(len(response.content))
+
+
+def render_metrics():
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return generate_latest(REGISTRY)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
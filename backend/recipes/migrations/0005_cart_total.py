@@ -0,0 +1,52 @@
+# Generated by Django 3.2.5 on 2026-10-18 19:53
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_cart_totals(apps, schema_editor):
+    CartTotal = apps.get_model('recipes', 'CartTotal')
+    RecipeIngredient = apps.get_model('recipes', 'RecipeIngredient')
+    rows = (
+        RecipeIngredient.objects
+        .filter(recipe__recipes_in__isnull=False)
+        .values('recipe__recipes_in__user', 'ingredient')
+        .annotate(total=models.Sum('amount'), entries=models.Count('id'))
+    )
+    CartTotal.objects.bulk_create(
+        CartTotal(user_id=row['recipe__recipes_in__user'],
+                  ingredient_id=row['ingredient'],
+                  amount=row['total'],
+                  recipes_count=row['entries'])
+        for row in rows.iterator()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0004_auto_20211205_0959'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CartTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.FloatField(default=0)),
+                ('recipes_count', models.PositiveIntegerField(default=0)),
+                ('ingredient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cart_totals', to='recipes.ingredient')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cart_totals', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Итог списка покупок',
+                'verbose_name_plural': 'Итоги списков покупок',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='carttotal',
+            constraint=models.UniqueConstraint(fields=('user', 'ingredient'), name='cart_total_unique'),
+        ),
+        migrations.RunPython(fill_cart_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 3.2.5 on 2026-10-18 19:55
+
+from django.db import migrations, models
+
+
+def merge_duplicate_ingredients(apps, schema_editor):
+    Ingredient = apps.get_model('recipes', 'Ingredient')
+    RecipeIngredient = apps.get_model('recipes', 'RecipeIngredient')
+    CartTotal = apps.get_model('recipes', 'CartTotal')
+    duplicates = (
+        Ingredient.objects
+        .values('name', 'measurement_unit')
+        .annotate(keep=models.Min('id'), total=models.Count('id'))
+        .filter(total__gt=1)
+    )
+    for duplicate in duplicates:
+        extra = Ingredient.objects.filter(
+            name=duplicate['name'],
+            measurement_unit=duplicate['measurement_unit']
+        ).exclude(id=duplicate['keep'])
+        RecipeIngredient.objects.filter(ingredient__in=extra).update(
+            ingredient=duplicate['keep']
+        )
+        for total in CartTotal.objects.filter(ingredient__in=extra):
+            kept, created = CartTotal.objects.get_or_create(
+                user_id=total.user_id, ingredient_id=duplicate['keep']
+            )
+            kept.amount += total.amount
+            kept.recipes_count += total.recipes_count
+            kept.save()
+        extra.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0005_cart_total'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_ingredients,
+                             migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+from django.db import migrations, models
+
+
+def merge_duplicate_rows(apps, schema_editor):
+    Tag = apps.get_model('recipes', 'Tag')
+    RecipeIngredient = apps.get_model('recipes', 'RecipeIngredient')
+    CartTotal = apps.get_model('recipes', 'CartTotal')
+    duplicate_slugs = (
+        Tag.objects.values('slug')
+        .annotate(total=models.Count('id'), keep=models.Min('id'))
+        .filter(total__gt=1)
+    )
+    for duplicate in duplicate_slugs:
+        for tag in Tag.objects.filter(slug=duplicate['slug']).exclude(
+                id=duplicate['keep']):
+            tag.slug = f'{tag.slug}-{tag.id}'
+            tag.save()
+    duplicate_rows = (
+        RecipeIngredient.objects.values('recipe', 'ingredient')
+        .annotate(total=models.Count('id'), keep=models.Min('id'),
+                  amount_sum=models.Sum('amount'))
+        .filter(total__gt=1)
+    )
+    merged = False
+    for duplicate in duplicate_rows:
+        RecipeIngredient.objects.filter(pk=duplicate['keep']).update(
+            amount=duplicate['amount_sum']
+        )
+        RecipeIngredient.objects.filter(
+            recipe=duplicate['recipe'], ingredient=duplicate['ingredient']
+        ).exclude(pk=duplicate['keep']).delete()
+        merged = True
+    if not merged:
+        return
+    rows = (
+        RecipeIngredient.objects
+        .filter(recipe__recipes_in__isnull=False)
+        .values('recipe__recipes_in__user', 'ingredient')
+        .annotate(total=models.Sum('amount'), entries=models.Count('id'))
+    )
+    CartTotal.objects.all().delete()
+    CartTotal.objects.bulk_create(
+        CartTotal(user_id=row['recipe__recipes_in__user'],
+                  ingredient_id=row['ingredient'],
+                  amount=row['total'],
+                  recipes_count=row['entries'])
+        for row in rows.iterator()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0011_job'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_rows, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 3.2.5 on 2026-10-18 20:26
+
+from django.db import migrations, models
+
+
+def fill_counters(apps, schema_editor):
+    schema_editor.execute(
+        'UPDATE recipes_appuser SET recipes_count = ('
+        'SELECT COUNT(*) FROM recipes_recipe recipe '
+        'WHERE recipe.author_id = recipes_appuser.id)'
+    )
+    schema_editor.execute(
+        'UPDATE recipes_appuser SET followers_count = ('
+        'SELECT COUNT(*) FROM recipes_subscription subscription '
+        'WHERE subscription.author_id = recipes_appuser.id)'
+    )
+    schema_editor.execute(
+        'UPDATE recipes_recipe SET favorites_count = ('
+        'SELECT COUNT(*) FROM recipes_favorite favorite '
+        'WHERE favorite.recipe_id = recipes_recipe.id)'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0015_feed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appuser',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Подписчики'),
+        ),
+        migrations.AddField(
+            model_name='appuser',
+            name='recipes_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Рецепты'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='В избранном'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
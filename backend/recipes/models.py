@@ -1,6 +1,8 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.utils import timezone
 
 
 class AppUser(AbstractUser):
@@ -19,6 +21,16 @@ class AppUser(AbstractUser):
         max_length=40,
         null=True
     )
+    followers_count = models.PositiveIntegerField(
+        verbose_name='Подписчики',
+        default=0,
+        editable=False
+    )
+    recipes_count = models.PositiveIntegerField(
+        verbose_name='Рецепты',
+        default=0,
+        editable=False
+    )
 
     class Meta:
         verbose_name = 'Пользователь'
@@ -31,7 +43,7 @@ class Tag(models.Model):
         max_length=25
     )
     color = models.CharField(max_length=15, verbose_name='Цвет')
-    slug = models.SlugField()
+    slug = models.SlugField(unique=True)
 
     class Meta:
         verbose_name = 'Тег'
@@ -57,6 +69,11 @@ class Recipe(models.Model):
         verbose_name='Изображение',
         null=True
     )
+    image_renditions = models.JSONField(
+        verbose_name='Уменьшенные изображения',
+        default=dict,
+        blank=True
+    )
     ingredients = models.ManyToManyField(
         through='RecipeIngredient',
         to='Ingredient'
@@ -74,8 +91,29 @@ class Recipe(models.Model):
         verbose_name='Описание',
         null=True
     )
+    created = models.DateTimeField(
+        verbose_name='Дата создания',
+        auto_now_add=True
+    )
+    updated = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True
+    )
+    search_vector = SearchVectorField(
+        verbose_name='Поисковый индекс',
+        null=True,
+        editable=False
+    )
+    favorites_count = models.PositiveIntegerField(
+        verbose_name='В избранном',
+        default=0,
+        editable=False
+    )
 
     class Meta:
+        indexes = (models.Index(fields=['author', '-id'],
+                                name='recipe_author_idx'),)
+        ordering = ('-id',)
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
 
@@ -94,6 +132,13 @@ class Ingredient(models.Model):
     )
 
     class Meta:
+        constraints = (
+            models.UniqueConstraint(fields=['name', 'measurement_unit'],
+                                    name='ingredient_unique'),
+        )
+        indexes = (models.Index(fields=['name'],
+                                name='ingredient_name_prefix_idx',
+                                opclasses=['varchar_pattern_ops']),)
         verbose_name = 'Ингредиент'
         verbose_name_plural = 'Ингредиенты'
 
@@ -113,6 +158,10 @@ class RecipeIngredient(models.Model):
     )
 
     class Meta:
+        constraints = (
+            models.UniqueConstraint(fields=['recipe', 'ingredient'],
+                                    name='recipe_ingredient_unique'),
+        )
         verbose_name = 'Ингредиент рецепта'
         verbose_name_plural = 'Ингредиенты рецепта'
 
@@ -156,3 +205,96 @@ class Subscription(models.Model):
                                                name='subscription_unique'),)
         verbose_name = 'Подписка'
         verbose_name_plural = 'Подписки'
+
+
+class FeedEntry(models.Model):
+    user = models.ForeignKey(AppUser, on_delete=models.CASCADE,
+                             related_name='feed_entries')
+    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE,
+                               related_name='feed_entries')
+    author = models.ForeignKey(AppUser, on_delete=models.CASCADE,
+                               related_name='+')
+
+    class Meta:
+        constraints = (models.UniqueConstraint(fields=['user', 'recipe'],
+                                               name='feed_entry_unique'),)
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+
+
+class CartTotal(models.Model):
+    user = models.ForeignKey(AppUser, on_delete=models.CASCADE,
+                             related_name='cart_totals')
+    ingredient = models.ForeignKey(Ingredient, on_delete=models.CASCADE,
+                                   related_name='cart_totals')
+    amount = models.FloatField(default=0)
+    recipes_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = (models.UniqueConstraint(fields=['user', 'ingredient'],
+                                               name='cart_total_unique'),)
+        verbose_name = 'Итог списка покупок'
+        verbose_name_plural = 'Итоги списков покупок'
+
+
+class Job(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField(verbose_name='Задача', max_length=100)
+    payload = models.JSONField(verbose_name='Параметры', default=dict)
+    result = models.JSONField(verbose_name='Результат', null=True, blank=True)
+    status = models.CharField(
+        verbose_name='Статус',
+        max_length=10,
+        choices=STATUSES,
+        default=QUEUED
+    )
+    attempts = models.PositiveIntegerField(verbose_name='Попытки', default=0)
+    max_attempts = models.PositiveIntegerField(
+        verbose_name='Максимум попыток',
+        default=5
+    )
+    run_at = models.DateTimeField(verbose_name='Запуск не раньше',
+                                  default=timezone.now)
+    error = models.TextField(verbose_name='Последняя ошибка', blank=True)
+    user = models.ForeignKey(AppUser,
+                             on_delete=models.SET_NULL,
+                             null=True,
+                             blank=True,
+                             related_name='jobs')
+    created = models.DateTimeField(verbose_name='Дата создания',
+                                   auto_now_add=True)
+    updated = models.DateTimeField(verbose_name='Дата изменения',
+                                   auto_now=True)
+
+    class Meta:
+        indexes = (models.Index(fields=['status', 'run_at'],
+                                name='job_queue_idx'),)
+        ordering = ('id',)
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+
+    def __str__(self):
+        return f'{self.name} #{self.id}'
+
+
+class ResourceVersion(models.Model):
+    resource = models.CharField(verbose_name='Ресурс', max_length=100,
+                                unique=True)
+    version = models.BigIntegerField(verbose_name='Версия')
+
+    class Meta:
+        verbose_name = 'Версия ресурса'
+        verbose_name_plural = 'Версии ресурсов'
+
+    def __str__(self):
+        return f'{self.resource}={self.version}'
@@ -1,6 +1,69 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class FetchedPage:
+    ordered = True
+
+    def __init__(self, count, start, items):
+        self.total = count
+        self.start = start
+        self.items = items
+
+    def count(self):
+        return self.total
+
+    def __getitem__(self, index):
+        return self.items if index.start == self.start else []
 
 
 class CorePagination(PageNumberPagination):
     page_size = 6
     page_size_query_param = 'limit'
+
+
+class RecipeCursorPagination(CursorPagination):
+    page_size = 6
+    page_size_query_param = 'limit'
+    ordering = '-id'
+
+
+class RecipePagination(CorePagination):
+    cursor_query_param = 'cursor'
+    cursor_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param in request.query_params:
+            self.cursor_paginator = RecipeCursorPagination()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class FeedPagination(CorePagination):
+    before_query_param = 'before'
+    max_page_size = 100
+
+    def paginate_ids(self, get_ids, request):
+        self.request = request
+        self.limit = self.get_page_size(request)
+        before = request.query_params.get(self.before_query_param, '')
+        self.ids = get_ids(int(before) if before.isdigit() else None,
+                           self.limit)
+        return self.ids
+
+    def get_next_link(self):
+        if len(self.ids) < self.limit:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(),
+                                   self.before_query_param, self.ids[-1])
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
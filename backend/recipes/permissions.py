@@ -1,3 +1,6 @@
+import ipaddress
+
+from django.conf import settings
 from rest_framework import permissions
 
 
@@ -10,3 +13,21 @@ class IsAuthorOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         return (request.method in permissions.SAFE_METHODS
                 or obj.author == request.user)
+
+
+class IsStaffOrMetricsAddress(permissions.BasePermission):
+
+    def has_permission(self, request, view):
+        return request.user.is_staff or self.is_allowed_address(
+            request.META.get('REMOTE_ADDR', '')
+        )
+
+    def is_allowed_address(self, address):
+        try:
+            address = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(
+            address in ipaddress.ip_network(network, strict=False)
+            for network in settings.METRICS_ALLOWED_IPS
+        )
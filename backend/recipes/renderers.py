@@ -0,0 +1,75 @@
+from rest_framework import renderers, status
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+LINE_SEPARATORS = (
+    ('\u2028'.encode(), b'\\u2028'),
+    ('\u2029'.encode(), b'\\u2029'),
+)
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    options = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+               if orjson else 0)
+    error_options = (options | orjson.OPT_PASSTHROUGH_SUBCLASS
+                     if orjson else 0)
+    builtin_types = (str, int, dict, list)
+
+    def default(self, obj):
+        for builtin_type in self.builtin_types:
+            if isinstance(obj, builtin_type):
+                return builtin_type(obj)
+        return self.encoder_class().default(obj)
+
+    def get_options(self, renderer_context):
+        response = renderer_context.get('response')
+        if response is None or status.is_success(response.status_code):
+            return self.options
+        return self.error_options
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer_context = renderer_context or {}
+        if (data is None or orjson is None
+                or self.get_indent(accepted_media_type, renderer_context)):
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        try:
+            content = orjson.dumps(data, default=self.default,
+                                   option=self.get_options(renderer_context))
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        for separator, escaped in LINE_SEPARATORS:
+            if separator in content:
+                content = content.replace(separator, escaped)
+        return content
+
+
+class ShoppingListRenderer(renderers.BaseRenderer):
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, bytes):
+            return data
+        if isinstance(data, dict):
+            data = data.get('detail', data)
+        return str(data).encode('utf-8')
+
+
+class TextRenderer(ShoppingListRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+
+
+class CSVRenderer(ShoppingListRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class PDFRenderer(ShoppingListRenderer):
+    media_type = 'application/pdf'
+    format = 'pdf'
+    charset = None
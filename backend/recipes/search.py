@@ -0,0 +1,80 @@
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            SearchVector)
+from django.db import connection
+from django.db.models import F, FloatField, Func, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .models import Recipe
+
+CONFIG = 'russian'
+FTS_TABLE = 'recipes_recipe_fts'
+
+
+class FtsRank(Func):
+    output_field = FloatField()
+
+    def __init__(self, query):
+        super().__init__(F('id'), Value(query))
+
+    def as_sql(self, compiler, connection, **extra_context):
+        id_sql, id_params = compiler.compile(self.source_expressions[0])
+        query_sql, query_params = compiler.compile(
+            self.source_expressions[1]
+        )
+        return (
+            f'(SELECT bm25({FTS_TABLE}, 10.0, 1.0) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH {query_sql} '
+            f'AND {FTS_TABLE}.rowid = {id_sql})',
+            (*query_params, *id_params)
+        )
+
+
+def get_search_vector():
+    return (SearchVector('name', weight='A', config=CONFIG)
+            + SearchVector('text', weight='B', config=CONFIG))
+
+
+def update_search_index(recipe_ids):
+    recipes = Recipe.objects.filter(pk__in=recipe_ids)
+    if connection.vendor == 'postgresql':
+        recipes.update(search_vector=get_search_vector())
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT OR REPLACE INTO {FTS_TABLE} (rowid, name, text) '
+                'VALUES (%s, %s, %s)',
+                [(pk, name, text or '') for pk, name, text
+                 in recipes.values_list('id', 'name', 'text')]
+            )
+
+
+def remove_from_search_index(recipe_id):
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                           [recipe_id])
+
+
+def get_fts_query(text):
+    return ' '.join(
+        '"{}"*'.format(word.replace('"', '""')) for word in text.split()
+    )
+
+
+def search_recipes(queryset, text):
+    if connection.vendor == 'postgresql':
+        query = SearchQuery(text, config=CONFIG, search_type='websearch')
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F('search_vector'), query)
+        ).order_by('-search_rank', '-id')
+    if connection.vendor == 'sqlite':
+        query = get_fts_query(text)
+        if not query:
+            return queryset
+        return queryset.filter(id__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            (query,)
+        )).annotate(
+            search_rank=FtsRank(query)
+        ).order_by('search_rank', '-id')
+    return queryset.filter(Q(name__icontains=text) | Q(text__icontains=text))
@@ -1,10 +1,61 @@
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
 from djoser.serializers import UserSerializer
 from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
+from rest_framework.reverse import reverse
+
+from .models import (AppUser, CartTotal, Favorite, Ingredient, Job, Recipe,
+                     RecipeIngredient, ShoppingList, Subscription, Tag)
+from .images import RENDITIONS
+from .jobs import enqueue, get_export_file
+from .utils import (get_existence, get_requested_fields,
+                    update_carts_with_recipe, update_or_create_ingredients)
+
+
+def represent_renditions(renditions, request):
+    sizes = RENDITIONS
+    if request is not None:
+        size = request.query_params.get('image_size')
+        if size in RENDITIONS:
+            sizes = (size,)
+    renditions = renditions or {}
+    images = {}
+    for size in sizes:
+        if size not in renditions:
+            continue
+        images[size] = {}
+        for extension, name in renditions[size].items():
+            url = default_storage.url(name)
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            images[size][extension] = url
+    return images
+
+
+class SparseFieldsMixin:
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or not hasattr(request, 'query_params'):
+            return
+        requested = get_requested_fields(request, self.fields)
+        for name in set(self.fields) - set(requested):
+            self.fields.pop(name)
+
+
+class ImageRenditionsField(serializers.Field):
+
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
 
-from .models import (AppUser, Favorite, Ingredient, Recipe, RecipeIngredient,
-                     ShoppingList, Subscription, Tag)
-from .utils import get_existence, update_or_create_ingredients
+    def to_representation(self, recipe):
+        return represent_renditions(recipe.image_renditions,
+                                    self.context.get('request'))
 
 
 class TagsSerializer(serializers.ModelSerializer):
@@ -14,7 +65,7 @@ class TagsSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class CustomUserSerializer(UserSerializer):
+class CustomUserSerializer(SparseFieldsMixin, UserSerializer):
     is_subscribed = serializers.SerializerMethodField()
 
     class Meta:
@@ -29,6 +80,9 @@ class CustomUserSerializer(UserSerializer):
         )
 
     def get_is_subscribed(self, obj):
+        is_subscribed = getattr(obj, 'is_subscribed', None)
+        if is_subscribed is not None:
+            return is_subscribed
         request = self.context.get('request')
         if request is None or request.user.is_anonymous:
             return False
@@ -59,8 +113,7 @@ class GetRecipeIngredientSerializer(serializers.ModelSerializer):
 
 class PostRecipeIngredientSerializer(serializers.ModelSerializer):
 
-    id = serializers.PrimaryKeyRelatedField(queryset=Ingredient.objects.all(),
-                                            source='ingredient.id')
+    id = serializers.IntegerField(source='ingredient_id')
 
     class Meta:
         model = RecipeIngredient
@@ -81,7 +134,7 @@ class RecipeIngredientSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'measurement_unit', 'amount')
 
 
-class GetRecipeSerializer(serializers.ModelSerializer):
+class GetRecipeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
     ingredients = RecipeIngredientSerializer(many=True,
@@ -89,18 +142,27 @@ class GetRecipeSerializer(serializers.ModelSerializer):
                                              source='ingredients_in')
     tags = TagsSerializer(many=True)
     author = CustomUserSerializer()
+    images = ImageRenditionsField()
 
     class Meta:
         model = Recipe
         fields = (
             'id', 'tags', 'author', 'ingredients', 'is_favorited',
-            'is_in_shopping_cart', 'name', 'image', 'text', 'cooking_time')
+            'is_in_shopping_cart', 'name', 'image', 'images', 'text',
+            'cooking_time')
+
+    def to_representation(self, instance):
+        author_is_subscribed = getattr(instance, 'author_is_subscribed', None)
+        if (author_is_subscribed is not None and 'author' in self.fields
+                and instance.author is not None):
+            instance.author.is_subscribed = author_is_subscribed
+        return super().to_representation(instance)
 
     def get_is_favorited(self, obj):
-        return get_existence(self, obj, Favorite)
+        return get_existence(self, obj, Favorite, 'is_favorited')
 
     def get_is_in_shopping_cart(self, obj):
-        return get_existence(self, obj, ShoppingList)
+        return get_existence(self, obj, ShoppingList, 'is_in_shopping_cart')
 
 
 class PostRecipeSerializer(serializers.ModelSerializer):
@@ -116,44 +178,81 @@ class PostRecipeSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Recipe
-        fields = '__all__'
+        exclude = ('image_renditions', 'created', 'updated',
+                   'search_vector', 'favorites_count')
         read_only_fields = ('author',)
 
+    @transaction.atomic
     def create(self, validated_data):
         ingredients = validated_data.pop('ingredients_in')
         tags = validated_data.pop('tags')
         recipe = Recipe.objects.create(**validated_data)
         recipe.tags.set(tags)
         update_or_create_ingredients(recipe, ingredients)
+        transaction.on_commit(
+            lambda: enqueue('make_renditions', recipe_id=recipe.id)
+        )
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         if 'ingredients' in self.initial_data:
             ingredients = validated_data.pop('ingredients_in')
-            instance.ingredients.clear()
-            update_or_create_ingredients(instance, ingredients)
+            deltas = update_or_create_ingredients(instance, ingredients)
+            update_carts_with_recipe(instance, deltas)
         if 'tags' in self.initial_data:
             tags = validated_data.pop('tags')
             instance.tags.set(tags)
         super().update(instance, validated_data)
+        if 'image' in validated_data:
+            transaction.on_commit(
+                lambda: enqueue('make_renditions', recipe_id=instance.id)
+            )
         return instance
 
     def validate(self, data):
-        ingredients = data['ingredients_in']
-        existing_ingredients = {}
-        for ingredient in ingredients:
-            if (
-                    ingredient['ingredient']['id']
-            ) not in existing_ingredients:
-                instance = ingredient['ingredient']['id']
-                existing_ingredients[instance] = True
-            else:
-                raise serializers.ValidationError(
-                    'Повторяющиеся ингредиенты в списке'
-                )
+        ingredients = data.get('ingredients_in')
+        if ingredients is None:
+            return data
+        ingredient_ids = [
+            ingredient['ingredient_id'] for ingredient in ingredients
+        ]
+        if len(ingredient_ids) != len(set(ingredient_ids)):
+            raise serializers.ValidationError(
+                'Повторяющиеся ингредиенты в списке'
+            )
+        existing_ids = set(Ingredient.objects.filter(
+            id__in=ingredient_ids
+        ).values_list('id', flat=True))
+        missing_ids = set(ingredient_ids) - existing_ids
+        if missing_ids:
+            raise serializers.ValidationError(
+                'Несуществующие ингредиенты: '
+                + ', '.join(map(str, sorted(missing_ids)))
+            )
         return data
 
 
+class CartTotalSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source='ingredient.id')
+    name = serializers.CharField(source='ingredient.name')
+    measurement_unit = serializers.CharField(
+        source='ingredient.measurement_unit'
+    )
+
+    class Meta:
+        model = CartTotal
+        fields = ('id', 'name', 'measurement_unit', 'amount')
+
+
+class RecipeIdsSerializer(serializers.Serializer):
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.BULK_RECIPES_LIMIT
+    )
+
+
 class ShoppingListSerializer(serializers.ModelSerializer):
 
     def validate(self, data):
@@ -187,17 +286,19 @@ class FavoriteSerializer(serializers.ModelSerializer):
 
 
 class RecipeToRepresentFavoriteSerializer(serializers.ModelSerializer):
+    images = ImageRenditionsField()
 
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'images', 'cooking_time')
 
 
 class RecipeSubscribe(serializers.ModelSerializer):
+    images = ImageRenditionsField()
 
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'images', 'cooking_time')
 
 
 class SubscribeSerializer(serializers.ModelSerializer):
@@ -214,9 +315,9 @@ class SubscribeSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class GetSubscribeSerializer(serializers.ModelSerializer):
+class GetSubscribeSerializer(SparseFieldsMixin,
+                             serializers.ModelSerializer):
     recipes = RecipeSubscribe(read_only=True, many=True)
-    recipes_count = serializers.SerializerMethodField()
     is_subscribed = serializers.SerializerMethodField()
 
     class Meta:
@@ -227,6 +328,9 @@ class GetSubscribeSerializer(serializers.ModelSerializer):
                   'recipes_count')
 
     def get_is_subscribed(self, obj):
+        is_subscribed = getattr(obj, 'is_subscribed', None)
+        if is_subscribed is not None:
+            return is_subscribed
         request = self.context.get('request')
         if request is None or request.user.is_anonymous:
             return False
@@ -234,5 +338,17 @@ class GetSubscribeSerializer(serializers.ModelSerializer):
             Subscription.objects.filter(user=request.user, author=obj).exists()
         )
 
-    def get_recipes_count(self, obj):
-        return obj.recipes.count()
+
+class JobSerializer(serializers.ModelSerializer):
+    download = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = ('id', 'name', 'status', 'attempts', 'result', 'error',
+                  'download', 'run_at', 'created', 'updated')
+
+    def get_download(self, obj):
+        if get_export_file(obj) is None:
+            return None
+        return reverse('jobs-download', args=(obj.id,),
+                       request=self.context.get('request'))
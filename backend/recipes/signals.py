@@ -0,0 +1,191 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from .authentication import bump_auth_version, forget_token
+from .cache import bump_version
+from .feed import (fill_author_feed, get_followers_count,
+                   remove_author_feed)
+from .jobs import enqueue
+from .models import (AppUser, Favorite, Ingredient, Recipe, RecipeIngredient,
+                     ShoppingList, Subscription, Tag)
+from .search import remove_from_search_index, update_search_index
+from .utils import apply_cart_deltas, get_recipe_amounts
+
+
+@receiver(pre_delete, sender=Recipe)
+def remove_recipe_from_cart_totals(sender, instance, **kwargs):
+    user_ids = list(
+        ShoppingList.objects.filter(recipe=instance)
+        .values_list('user', flat=True)
+    )
+    if not user_ids:
+        return
+    deltas = {
+        ingredient_id: (-amount, -entries)
+        for ingredient_id, (amount, entries)
+        in get_recipe_amounts([instance.id]).items()
+    }
+    apply_cart_deltas(user_ids, deltas)
+
+
+@receiver(post_save, sender=Recipe)
+def index_recipe(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or {'name', 'text'} & set(update_fields):
+        update_search_index([instance.pk])
+
+
+@receiver(post_delete, sender=Recipe)
+def unindex_recipe(sender, instance, **kwargs):
+    remove_from_search_index(instance.pk)
+
+
+@receiver(post_save, sender=Recipe)
+def count_new_recipe(sender, instance, created, **kwargs):
+    if created:
+        AppUser.objects.filter(pk=instance.author_id).update(
+            recipes_count=F('recipes_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Recipe)
+def count_deleted_recipe(sender, instance, **kwargs):
+    AppUser.objects.filter(
+        pk=instance.author_id, recipes_count__gt=0
+    ).update(recipes_count=F('recipes_count') - 1)
+
+
+@receiver(post_save, sender=Favorite)
+def count_new_favorite(sender, instance, created, **kwargs):
+    if created:
+        Recipe.objects.filter(pk=instance.recipe_id).update(
+            favorites_count=F('favorites_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Favorite)
+def count_deleted_favorite(sender, instance, **kwargs):
+    Recipe.objects.filter(
+        pk=instance.recipe_id, favorites_count__gt=0
+    ).update(favorites_count=F('favorites_count') - 1)
+
+
+@receiver(post_save, sender=Recipe)
+def fan_out_new_recipe(sender, instance, created, **kwargs):
+    if (settings.FEED_FANOUT and created
+            and instance.author_id is not None):
+        transaction.on_commit(
+            lambda: enqueue('fan_out_recipe', recipe_id=instance.pk)
+        )
+
+
+def change_feed_mode(author_id, task):
+    bump_version('feed')
+    transaction.on_commit(lambda: enqueue(task, author_id=author_id))
+
+
+@receiver(post_save, sender=Subscription)
+def follow_author(sender, instance, created, **kwargs):
+    if not created:
+        return
+    AppUser.objects.filter(pk=instance.author_id).update(
+        followers_count=F('followers_count') + 1
+    )
+    if not settings.FEED_FANOUT:
+        return
+    if get_followers_count(instance.author_id) == (
+            settings.FEED_FANOUT_LIMIT + 1):
+        change_feed_mode(instance.author_id, 'drop_author_feed')
+    else:
+        fill_author_feed(instance.author_id, [instance.user_id])
+
+
+@receiver(post_delete, sender=Subscription)
+def unfollow_author(sender, instance, **kwargs):
+    AppUser.objects.filter(
+        pk=instance.author_id, followers_count__gt=0
+    ).update(followers_count=F('followers_count') - 1)
+    if not settings.FEED_FANOUT:
+        return
+    remove_author_feed(instance.user_id, instance.author_id)
+    if get_followers_count(instance.author_id) == settings.FEED_FANOUT_LIMIT:
+        change_feed_mode(instance.author_id, 'fill_author_feed')
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def bump_recipes_version(sender, **kwargs):
+    bump_version('recipes')
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def touch_recipe_ingredients(sender, instance, **kwargs):
+    Recipe.objects.filter(pk=instance.recipe_id).update(
+        updated=timezone.now()
+    )
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def touch_recipe_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        recipes = Recipe.objects.filter(pk=instance.pk)
+    elif pk_set:
+        recipes = Recipe.objects.filter(pk__in=pk_set)
+    else:
+        recipes = instance.recipes.all()
+    recipes.update(updated=timezone.now())
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+@receiver(post_save, sender=ShoppingList)
+@receiver(post_delete, sender=ShoppingList)
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def bump_user_version(sender, instance, **kwargs):
+    bump_version(f'user:{instance.user_id}')
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def bump_tags_version(sender, **kwargs):
+    bump_version('tags')
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def bump_ingredients_version(sender, **kwargs):
+    bump_version('ingredients')
+
+
+@receiver(post_save, sender=AppUser)
+@receiver(post_delete, sender=AppUser)
+def bump_users_version(sender, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    bump_version('users')
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_token(sender, instance, **kwargs):
+    forget_token(instance.key)
+    bump_auth_version(instance.user_id)
+
+
+@receiver(post_save, sender=AppUser)
+@receiver(post_delete, sender=AppUser)
+def invalidate_user_tokens(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    bump_auth_version(instance.pk)
@@ -0,0 +1,96 @@
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from rest_framework.test import APITestCase
+
+from ..cache import get_versions
+from ..models import AppUser, Ingredient, Recipe, RecipeIngredient, Tag
+
+
+def create_user(name):
+    return AppUser.objects.create_user(
+        email=f'{name}@example.com', username=name, password='password',
+        first_name=name, last_name=name
+    )
+
+
+def create_recipes(author, count, tags, ingredients):
+    recipes = []
+    for number in range(count):
+        recipe = Recipe.objects.create(
+            author=author, name=f'Рецепт {number}', text='Описание',
+            cooking_time=10, image='recipes/test.png'
+        )
+        recipe.tags.set(tags)
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(recipe=recipe, ingredient=ingredient, amount=1)
+            for ingredient in ingredients
+        )
+        recipes.append(recipe)
+    return recipes
+
+
+class RecipeDataMixin:
+    recipe_count = 60
+
+    @classmethod
+    def create_data(cls):
+        cls.author = create_user('author')
+        cls.user = create_user('reader')
+        cls.tags = [
+            Tag.objects.create(name=f'Тег {number}', color='#000000',
+                               slug=f'tag{number}')
+            for number in range(2)
+        ]
+        cls.ingredients = [
+            Ingredient.objects.create(name=f'Ингредиент {number}',
+                                      measurement_unit='г')
+            for number in range(3)
+        ]
+        cls.recipes = create_recipes(cls.author, cls.recipe_count, cls.tags,
+                                     cls.ingredients)
+        get_versions(['recipes', 'tags', 'ingredients', 'users',
+                      f'user:{cls.user.id}'])
+
+
+class RecipeDataTestCase(RecipeDataMixin, APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_data()
+
+    def setUp(self):
+        cache.clear()
+
+
+async def asgi_get(path, query='', headers=None):
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'root_path': '',
+        'query_string': query.encode(),
+        'headers': [(b'host', b'testserver')] + [
+            (name.lower().encode(), value.encode())
+            for name, value in (headers or {}).items()
+        ],
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 50000),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await ASGIHandler()(scope, receive, send)
+    start, *body = messages
+    return (start['status'], dict(
+        (name.decode().lower(), value.decode())
+        for name, value in start['headers']
+    ), b''.join(message.get('body', b'') for message in body))
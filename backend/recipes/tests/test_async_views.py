@@ -0,0 +1,135 @@
+import json
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from rest_framework.authtoken.models import Token
+
+from ..models import CartTotal, Favorite
+from .base import RecipeDataMixin, asgi_get
+
+
+@override_settings(ROOT_URLCONF='recipes.tests.urls')
+class AsgiDownloadTest(RecipeDataMixin, TransactionTestCase):
+    recipe_count = 1
+
+    def setUp(self):
+        self.create_data()
+        self.token = Token.objects.create(user=self.user)
+        CartTotal.objects.bulk_create(
+            CartTotal(user=self.user, ingredient=ingredient, amount=100,
+                      recipes_count=1)
+            for ingredient in self.ingredients
+        )
+
+    async def test_download_reads_whole_body(self):
+        for file_format, marker in (('txt', 'Ингредиент 2'.encode()),
+                                    ('csv', 'Ингредиент 2'.encode()),
+                                    ('pdf', b'%%EOF')):
+            with self.subTest(file_format=file_format):
+                status, headers, body = await asgi_get(
+                    '/api/recipes/download_shopping_cart/',
+                    f'format={file_format}',
+                    {'Authorization': f'Token {self.token.key}'}
+                )
+                self.assertEqual(status, 200)
+                self.assertIn(marker, body)
+
+
+HEADERS = ('content-type', 'etag', 'last-modified', 'x-cache')
+
+
+class AsyncParityTest(RecipeDataMixin, TransactionTestCase):
+    recipe_count = 8
+
+    def setUp(self):
+        self.create_data()
+        self.token = Token.objects.create(user=self.user)
+        Favorite.objects.create(user=self.user, recipe=self.recipes[0])
+
+    async def fetch(self, urlconf, path, query, headers):
+        cache.clear()
+        responses = []
+        with override_settings(ROOT_URLCONF=urlconf):
+            for _ in range(2):
+                status, response_headers, body = await asgi_get(
+                    path, query, headers
+                )
+                responses.append((status, body, {
+                    name: response_headers.get(name) for name in HEADERS
+                }))
+            etag = response_headers.get('etag')
+            if etag:
+                status, _, body = await asgi_get(
+                    path, query, {**headers, 'If-None-Match': etag}
+                )
+                responses.append((status, body))
+        return responses
+
+    async def check(self, path, query='', headers=None):
+        headers = headers or {}
+        with self.subTest(path=path, query=query, headers=headers):
+            self.assertEqual(
+                await self.fetch('recipes.tests.urls', path, query, headers),
+                await self.fetch('foodgram.urls', path, query, headers)
+            )
+
+    async def check_recipes(self, headers):
+        recipe_id = self.recipes[0].id
+        for query in ('', 'limit=3&page=2', 'tags=tag0', 'is_favorited=1',
+                      'fields=id,name,is_favorited', 'tags=nonexistent'):
+            await self.check('/api/recipes/', query, headers)
+        await self.check(f'/api/recipes/{recipe_id}/', '', headers)
+        await self.check('/api/recipes/999999/', '', headers)
+
+    async def test_recipes_match_sync_views(self):
+        await self.check_recipes({})
+        await self.check_recipes(
+            {'Authorization': f'Token {self.token.key}'}
+        )
+
+    async def test_validation_error_body(self):
+        with override_settings(ROOT_URLCONF='recipes.tests.urls'):
+            status, _, body = await asgi_get('/api/recipes/',
+                                             'tags=nonexistent')
+        self.assertEqual(status, 400)
+        self.assertEqual(json.loads(body), {'tags': [
+            'Select a valid choice. '
+            'nonexistent is not one of the available choices.'
+        ]})
+
+    async def test_fast_serializer_matches_sync_views(self):
+        with override_settings(FAST_RECIPE_SERIALIZER=True):
+            await self.check_recipes({})
+            await self.check_recipes(
+                {'Authorization': f'Token {self.token.key}'}
+            )
+
+    async def test_catalogs_match_sync_views(self):
+        tag_id, ingredient_id = self.tags[0].id, self.ingredients[0].id
+        for path, query in (('/api/tags/', ''),
+                            ('/api/tags/', 'page=1'),
+                            (f'/api/tags/{tag_id}/', ''),
+                            ('/api/tags/999999/', ''),
+                            ('/api/ingredients/', ''),
+                            ('/api/ingredients/', 'name=%D0%B8%D0%BD'),
+                            ('/api/ingredients/', 'page=1'),
+                            (f'/api/ingredients/{ingredient_id}/', '')):
+            await self.check(path, query)
+
+
+@override_settings(ROOT_URLCONF='recipes.tests.urls')
+class AsyncConnectionTest(RecipeDataMixin, TransactionTestCase):
+    recipe_count = 8
+
+    def setUp(self):
+        self.create_data()
+
+    async def test_database_threads_keep_connections(self):
+        with mock.patch.object(type(connections['default']), 'close',
+                               autospec=True) as close:
+            for _ in range(5):
+                status, _, _ = await asgi_get('/api/recipes/', 'limit=3')
+                self.assertEqual(status, 200)
+        self.assertEqual(close.call_count, 0)
@@ -0,0 +1,61 @@
+import shutil
+import tempfile
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import exceptions
+from rest_framework.authtoken.models import Token
+
+from ..authentication import (CachedTokenAuthentication, bump_auth_version,
+                              tokens)
+from .base import create_user
+
+
+class CachedTokenAuthenticationTest(TestCase):
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token = Token.objects.create(user=create_user('reader'))
+        self.authentication = CachedTokenAuthentication()
+        tokens.entries.clear()
+        self.addCleanup(tokens.entries.clear)
+
+    def use_shared_cache(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        settings_override = override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': location,
+        }}, AUTH_TOKEN_SHARED_CACHE=True)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def revoke_elsewhere(self):
+        Token.objects.filter(pk=self.token.pk)._raw_delete('default')
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_auth_version(self.token.user_id)
+
+    def check_lru(self):
+        self.authentication.authenticate_credentials(self.token.key)
+        queries = CaptureQueriesContext(connection)
+        with queries:
+            user, _ = self.authentication.authenticate_credentials(
+                self.token.key
+            )
+        self.assertEqual(user.pk, self.token.user_id)
+        self.assertFalse([
+            query for query in queries.captured_queries
+            if Token._meta.db_table in query['sql']
+        ])
+        self.assertEqual(len(queries.captured_queries), 1)
+        self.revoke_elsewhere()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authentication.authenticate_credentials(self.token.key)
+
+    def test_default_cache_uses_lru_and_sees_revocation(self):
+        self.check_lru()
+
+    def test_shared_cache_uses_lru_and_sees_revocation(self):
+        self.use_shared_cache()
+        self.check_lru()
@@ -0,0 +1,78 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..models import Favorite, Recipe, ShoppingList
+from ..utils import insert_recipe_links
+from .base import RecipeDataTestCase
+
+
+class BulkRecipeListTest(RecipeDataTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+        self.ids = [recipe.id for recipe in self.recipes[:3]]
+
+    def test_insert_returns_only_created_rows(self):
+        Favorite.objects.bulk_create(
+            [Favorite(user=self.user, recipe_id=self.ids[0])]
+        )
+        self.assertEqual(
+            insert_recipe_links(Favorite, self.user.id, self.ids),
+            set(self.ids[1:])
+        )
+        self.assertEqual(
+            Favorite.objects.filter(user=self.user).count(), 3
+        )
+
+    def test_favorites_count_matches_rows(self):
+        for _ in range(2):
+            response = self.client.post('/api/recipes/favorite/',
+                                        {'recipes': self.ids}, format='json')
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [item['result'] for item in response.data['results']],
+            ['exists'] * 3
+        )
+        self.assertEqual(list(Recipe.objects.filter(
+            id__in=self.ids
+        ).values_list('favorites_count', flat=True)), [1, 1, 1])
+        self.client.delete('/api/recipes/favorite/', {'recipes': self.ids},
+                           format='json')
+        self.assertEqual(list(Recipe.objects.filter(
+            id__in=self.ids
+        ).values_list('favorites_count', flat=True)), [0, 0, 0])
+
+    def test_shopping_cart_bulk(self):
+        response = self.client.post('/api/recipes/shopping_cart/',
+                                    {'recipes': self.ids + [999999]},
+                                    format='json')
+        self.assertEqual(
+            [item['result'] for item in response.data['results']],
+            ['added'] * 3 + ['not_found']
+        )
+        self.assertEqual(
+            ShoppingList.objects.filter(user=self.user).count(), 3
+        )
+
+    def count_queries(self, method, url, ids):
+        context = CaptureQueriesContext(connection)
+        with context:
+            response = getattr(self.client, method)(
+                url, {'recipes': ids}, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_query_count_does_not_grow_with_ids(self):
+        for url in ('/api/recipes/favorite/', '/api/recipes/shopping_cart/'):
+            for method in ('post', 'delete'):
+                with self.subTest(url=url, method=method):
+                    self.assertEqual(
+                        self.count_queries(method, url, [
+                            recipe.id for recipe in self.recipes[:5]
+                        ]),
+                        self.count_queries(method, url, [
+                            recipe.id for recipe in self.recipes[5:50]
+                        ])
+                    )
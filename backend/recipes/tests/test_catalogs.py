@@ -0,0 +1,63 @@
+import gzip
+from unittest import mock
+
+from django.db.models import F
+from django.test import override_settings
+
+from ..compression import ENCODINGS, compress_gzip
+from ..models import Ingredient, ResourceVersion
+from .base import RecipeDataTestCase
+
+
+class CatalogSnapshotTest(RecipeDataTestCase):
+
+    def add_ingredient_elsewhere(self):
+        Ingredient.objects.bulk_create(
+            [Ingredient(name='zzqx', measurement_unit='г')]
+        )
+
+    def get_names(self, params=None):
+        response = self.client.get('/api/ingredients/', params)
+        self.assertEqual(response.status_code, 200)
+        return [item['name'] for item in response.json()]
+
+    def test_shared_version_refreshes_snapshot_and_index(self):
+        self.assertNotIn('zzqx', self.get_names())
+        self.assertEqual(self.get_names({'name': 'zzqx'}), [])
+        self.add_ingredient_elsewhere()
+        ResourceVersion.objects.filter(resource='ingredients').update(
+            version=F('version') + 1
+        )
+        self.assertIn('zzqx', self.get_names())
+        self.assertEqual(self.get_names({'name': 'zzqx'}), ['zzqx'])
+
+    def test_ttl_refreshes_snapshot_and_index(self):
+        self.get_names()
+        self.get_names({'name': 'zzqx'})
+        self.add_ingredient_elsewhere()
+        with override_settings(CATALOG_SNAPSHOT_TTL=-1):
+            self.assertIn('zzqx', self.get_names())
+            self.assertEqual(self.get_names({'name': 'zzqx'}), ['zzqx'])
+
+    def test_compressed_snapshot_is_cached(self):
+        Ingredient.objects.bulk_create(
+            Ingredient(name=f'Продукт {number}', measurement_unit='г')
+            for number in range(100)
+        )
+        ResourceVersion.objects.filter(resource='ingredients').update(
+            version=F('version') + 1
+        )
+        content = self.client.get('/api/ingredients/').content
+        compress = mock.Mock(side_effect=compress_gzip)
+        with mock.patch.dict(ENCODINGS, gzip=compress):
+            for _ in range(3):
+                response = self.client.get('/api/ingredients/',
+                                           HTTP_ACCEPT_ENCODING='gzip')
+                self.assertEqual(response['Content-Encoding'], 'gzip')
+                self.assertEqual(gzip.decompress(response.content), content)
+            response = self.client.get(
+                '/api/ingredients/', HTTP_ACCEPT_ENCODING='gzip',
+                HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(compress.call_count, 1)
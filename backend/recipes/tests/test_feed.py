@@ -0,0 +1,30 @@
+from django.test import override_settings
+
+from ..models import FeedEntry, Subscription
+from .base import RecipeDataTestCase
+
+
+class FeedTest(RecipeDataTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+
+    def get_feed_ids(self):
+        response = self.client.get('/api/recipes/feed/', {'limit': 5})
+        self.assertEqual(response.status_code, 200)
+        return [recipe['id'] for recipe in response.data['results']]
+
+    def test_join_without_fan_out(self):
+        Subscription.objects.create(user=self.user, author=self.author)
+        self.assertFalse(FeedEntry.objects.exists())
+        self.assertEqual(self.get_feed_ids(),
+                         [recipe.id for recipe in self.recipes[:-6:-1]])
+
+    @override_settings(FEED_FANOUT=True)
+    def test_fan_out_table(self):
+        Subscription.objects.create(user=self.user, author=self.author)
+        self.assertEqual(FeedEntry.objects.filter(user=self.user).count(),
+                         len(self.recipes))
+        self.assertEqual(self.get_feed_ids(),
+                         [recipe.id for recipe in self.recipes[:-6:-1]])
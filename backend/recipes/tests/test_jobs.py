@@ -0,0 +1,107 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from ..jobs import TASKS, claim_jobs, enqueue, execute, prune_jobs
+from ..models import CartTotal, Ingredient, Job
+from .base import create_user
+
+
+def fail():
+    raise RuntimeError('boom')
+
+
+@override_settings(BACKGROUND_JOBS=False)
+class JobTest(TestCase):
+
+    def setUp(self):
+        TASKS['fail'] = fail
+        self.addCleanup(TASKS.pop, 'fail')
+
+    def test_inline_failure_is_not_requeued(self):
+        job = enqueue('fail')
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 1)
+        self.assertIn('boom', job.error)
+
+    def test_prune_keeps_recent_and_pending_jobs(self):
+        old = timezone.now() - timedelta(days=10)
+        for status in (Job.DONE, Job.FAILED, Job.QUEUED, Job.RUNNING):
+            Job.objects.create(name='fail', status=status)
+        Job.objects.update(updated=old)
+        recent = Job.objects.create(name='fail', status=Job.DONE)
+        self.assertEqual(prune_jobs(7), 2)
+        self.assertCountEqual(
+            Job.objects.values_list('status', flat=True),
+            [Job.QUEUED, Job.RUNNING, recent.status]
+        )
+
+
+class ExportTest(APITestCase):
+
+    def setUp(self):
+        exports_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, exports_root)
+        settings_override = override_settings(EXPORTS_ROOT=exports_root,
+                                              BACKGROUND_JOBS=True)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.exports_root = exports_root
+        self.user = create_user('owner')
+        ingredient = Ingredient.objects.create(name='Соль',
+                                               measurement_unit='г')
+        CartTotal.objects.create(user=self.user, ingredient=ingredient,
+                                 amount=5, recipes_count=1)
+        self.client.force_authenticate(self.user)
+
+    def export(self):
+        response = self.client.post('/api/recipes/shopping_cart_export/',
+                                    {'format': 'txt'})
+        self.assertEqual(response.status_code, 202)
+        return response.data['id']
+
+    def test_export_waits_for_worker(self):
+        job_id = self.export()
+        job = Job.objects.get(pk=job_id)
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertEqual(os.listdir(self.exports_root), [])
+        self.assertEqual(claim_jobs(10), [job_id])
+        self.assertEqual(execute(job_id).status, Job.DONE)
+
+    def test_download_is_private_to_owner(self):
+        job_id = self.export()
+        claim_jobs(10)
+        execute(job_id)
+        response = self.client.get(f'/api/jobs/{job_id}/')
+        download = response.data['download']
+        self.assertTrue(download.endswith(f'/api/jobs/{job_id}/download/'))
+        self.assertNotIn(settings.MEDIA_URL, str(response.data['result']))
+
+        response = self.client.get(download)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('shopping_list.txt', response['Content-Disposition'])
+        self.assertIn('Соль', b''.join(response.streaming_content).decode())
+
+        stranger = create_user('stranger')
+        stranger.is_staff = True
+        stranger.save()
+        self.client.force_authenticate(stranger)
+        self.assertEqual(self.client.get(download).status_code, 404)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(download).status_code, 401)
+
+    def test_prune_removes_export_file(self):
+        job_id = self.export()
+        claim_jobs(10)
+        execute(job_id)
+        self.assertEqual(len(os.listdir(self.exports_root)), 1)
+        Job.objects.update(updated=timezone.now() - timedelta(days=10))
+        self.assertEqual(prune_jobs(7), 1)
+        self.assertEqual(os.listdir(self.exports_root), [])
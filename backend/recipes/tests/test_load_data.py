@@ -0,0 +1,56 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from ..management.commands.load_data import read_json_array
+from ..models import Ingredient
+
+ROWS = [
+    {'name': 'Соль', 'measurement_unit': 'г'},
+    {'name': 'Мука', 'measurement_unit': 'г'},
+    {'name': 'Молоко', 'measurement_unit': 'мл'},
+    {'name': 'Мука', 'measurement_unit': 'г'},
+]
+
+
+class LoadDataTest(TestCase):
+
+    def setUp(self):
+        Ingredient.objects.create(name='Соль', measurement_unit='г')
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.path = os.path.join(directory, 'ingredients.json')
+        with open(self.path, 'w', encoding='UTF-8') as file:
+            json.dump(ROWS, file, ensure_ascii=False)
+
+    def load(self, **options):
+        stdout = io.StringIO()
+        call_command('load_data', path=self.path, batch_size=2,
+                     stdout=stdout, **options)
+        return stdout.getvalue()
+
+    def test_json_is_read_in_chunks(self):
+        with open(self.path, encoding='UTF-8') as file:
+            self.assertEqual(list(read_json_array(file, chunk_size=5)), ROWS)
+
+    def test_dry_run_does_not_write(self):
+        queries = CaptureQueriesContext(connection)
+        with queries:
+            output = self.load(dry_run=True)
+        self.assertIn('добавлено: 2', output)
+        self.assertFalse([
+            query for query in queries.captured_queries
+            if not query['sql'].startswith('SELECT')
+        ])
+        self.assertEqual(Ingredient.objects.count(), 1)
+
+    def test_load_inserts_new_rows(self):
+        self.assertIn('добавлено: 2', self.load())
+        self.assertEqual(Ingredient.objects.count(), 3)
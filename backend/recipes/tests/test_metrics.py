@@ -0,0 +1,53 @@
+from django.test import TestCase, TransactionTestCase, override_settings
+from prometheus_client import REGISTRY
+
+from .base import RecipeDataMixin, asgi_get
+
+LABELS = {'view': 'recipes-list', 'method': 'GET'}
+
+
+def get_sample(name):
+    return REGISTRY.get_sample_value(name, LABELS) or 0
+
+
+class QueryMetricsTest(RecipeDataMixin, TransactionTestCase):
+    recipe_count = 3
+
+    def setUp(self):
+        self.create_data()
+
+    def get_samples(self):
+        return (get_sample('foodgram_db_queries_sum'),
+                get_sample('foodgram_db_time_seconds_sum'))
+
+    def assert_counted(self, before):
+        for old, new in zip(before, self.get_samples()):
+            self.assertGreater(new, old)
+
+    def test_sync_request_counts_queries(self):
+        before = self.get_samples()
+        self.client.get('/api/recipes/')
+        self.assert_counted(before)
+
+    @override_settings(ROOT_URLCONF='recipes.tests.urls')
+    async def test_async_request_counts_queries(self):
+        before = self.get_samples()
+        status, _, _ = await asgi_get('/api/recipes/')
+        self.assertEqual(status, 200)
+        self.assert_counted(before)
+
+
+class MetricsAccessTest(TestCase):
+
+    def test_local_address_is_not_trusted_by_default(self):
+        response = self.client.get('/api/metrics/', REMOTE_ADDR='127.0.0.1')
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(METRICS_ALLOWED_IPS=['10.0.0.5', '172.18.0.0/16'])
+    def test_allowed_addresses_and_networks(self):
+        for address, status in (('10.0.0.5', 200), ('172.18.3.4', 200),
+                                ('10.0.0.6', 401), ('unknown', 401)):
+            with self.subTest(address=address):
+                response = self.client.get('/api/metrics/',
+                                           REMOTE_ADDR=address)
+                self.assertEqual(response.status_code, status)
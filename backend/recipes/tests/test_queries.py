@@ -0,0 +1,37 @@
+from .base import RecipeDataTestCase
+
+LIST_QUERIES = 6
+DETAIL_QUERIES = 5
+
+
+class RecipeQueryBudgetTest(RecipeDataTestCase):
+
+    def check_list(self, limit):
+        with self.assertNumQueries(LIST_QUERIES):
+            response = self.client.get('/api/recipes/', {'limit': limit})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), limit)
+
+    def check_detail(self):
+        with self.assertNumQueries(DETAIL_QUERIES):
+            response = self.client.get(f'/api/recipes/{self.recipes[0].id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['ingredients']), 3)
+
+    def test_anonymous_list(self):
+        for limit in (25, 50):
+            with self.subTest(limit=limit):
+                self.check_list(limit)
+
+    def test_authenticated_list(self):
+        self.client.force_authenticate(self.user)
+        for limit in (25, 50):
+            with self.subTest(limit=limit):
+                self.check_list(limit)
+
+    def test_anonymous_detail(self):
+        self.check_detail()
+
+    def test_authenticated_detail(self):
+        self.client.force_authenticate(self.user)
+        self.check_detail()
@@ -0,0 +1,52 @@
+import io
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+
+from ..models import AppUser, Subscription
+from .base import RecipeDataMixin
+
+
+class CheckQueryPlansTest(RecipeDataMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_data()
+        AppUser.objects.bulk_create(
+            AppUser(email=f'reader{number}@example.com',
+                    username=f'reader{number}', first_name='Читатель',
+                    last_name='Читатель', password='!')
+            for number in range(101)
+        )
+        readers = list(AppUser.objects.filter(username__startswith='reader')
+                       .exclude(pk=cls.user.pk).order_by('id'))
+        Subscription.objects.bulk_create(
+            Subscription(user=reader, author=author)
+            for reader, author in zip(readers, readers[1:])
+        )
+
+    def check_plans(self):
+        stdout = io.StringIO()
+        call_command('check_query_plans', min_rows=100, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_empty_database_is_not_checked(self):
+        with self.assertRaisesMessage(CommandError, 'seed_benchmark_data'):
+            call_command('check_query_plans', stdout=io.StringIO())
+
+    def test_indexed_queries_pass(self):
+        self.assertIn('Все запросы используют индексы', self.check_plans())
+
+    def test_missing_index_fails(self):
+        table = Subscription._meta.db_table
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor,
+                                                                   table)
+            for name, constraint in constraints.items():
+                if constraint['index'] and constraint['columns'] == [
+                        'author_id']:
+                    cursor.execute(f'DROP INDEX {name}')
+        with self.assertRaisesMessage(CommandError, 'подписчики автора'):
+            self.check_plans()
@@ -0,0 +1,47 @@
+import io
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import override_settings
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from ..models import Recipe
+from .base import create_user
+
+
+class GenerateRenditionsTest(APITestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        buffer = io.BytesIO()
+        Image.new('RGB', (64, 48), 'red').save(buffer, 'PNG')
+        name = default_storage.save('recipes/red.png',
+                                    ContentFile(buffer.getvalue()))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipe = Recipe.objects.create(
+                author=create_user('author'), name='Рецепт',
+                text='Описание', cooking_time=5, image=name
+            )
+        Recipe.objects.filter(pk=self.recipe.pk).update(image_renditions={})
+
+    def test_backfill_changes_etag(self):
+        url = f'/api/recipes/{self.recipe.id}/'
+        response = self.client.get(url)
+        self.assertEqual(response.data['images'], {})
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('generate_renditions', workers=1,
+                         stdout=io.StringIO())
+        response = self.client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data['images']),
+                         {'avatar', 'card', 'detail'})
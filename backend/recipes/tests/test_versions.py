@@ -0,0 +1,27 @@
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from ..cache import get_version
+from ..models import ResourceVersion
+from .base import RecipeDataMixin, create_recipes
+
+
+class BumpVersionTest(RecipeDataMixin, TransactionTestCase):
+    recipe_count = 1
+
+    def setUp(self):
+        self.create_data()
+
+    def test_bumps_once_on_commit(self):
+        version = get_version('recipes')
+        queries = CaptureQueriesContext(connection)
+        with queries, transaction.atomic():
+            create_recipes(self.author, 3, self.tags, self.ingredients)
+            self.assertEqual(get_version('recipes'), version)
+        self.assertEqual(len([
+            query for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE')
+            and ResourceVersion._meta.db_table in query['sql']
+        ]), 1)
+        self.assertEqual(get_version('recipes'), version + 1)
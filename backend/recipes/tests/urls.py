@@ -0,0 +1,4 @@
+from ..async_views import urlpatterns as async_urlpatterns
+from ..urls import urlpatterns
+
+urlpatterns = async_urlpatterns + urlpatterns
@@ -1,20 +1,25 @@
+from django.conf import settings
 from django.urls import include, path
 from rest_framework import routers
 
-from .views import (CustomUserViewSet, IngredientViewSet, RecipeViewSet,
-                    TagViewSet, add_favorite, download_shopping_list,
-                    shopping_list, subscription, subscriptions_list)
+from .views import (CustomUserViewSet, IngredientViewSet, JobViewSet,
+                    RecipeViewSet, TagViewSet, add_favorite,
+                    download_shopping_list, favorite_bulk, feed, metrics,
+                    shopping_cart_bulk, shopping_cart_export,
+                    shopping_cart_summary, shopping_list, subscription,
+                    subscriptions_list)
 
 router = routers.DefaultRouter()
 router.register('recipes', RecipeViewSet, 'recipes')
 router.register('tags', TagViewSet, 'tags')
 router.register('ingredients', IngredientViewSet, 'ingredients')
 router.register('users', CustomUserViewSet, 'users')
+router.register('jobs', JobViewSet, 'jobs')
 
 urlpatterns = [
     path('api/users/subscriptions/',
          subscriptions_list,
-         name='user_subscription'),
+         name='user_subscriptions'),
     path('api/users/<int:id>/subscribe/',
          subscription,
          name='user_subscription'),
@@ -24,10 +29,33 @@ urlpatterns = [
     path('api/recipes/<int:id>/favorite/',
          add_favorite,
          name='add_to_favorite'),
+    path('api/recipes/favorite/',
+         favorite_bulk,
+         name='favorite_bulk'),
+    path('api/recipes/shopping_cart/',
+         shopping_cart_bulk,
+         name='shopping_cart_bulk'),
+    path('api/recipes/feed/',
+         feed,
+         name='recipe_feed'),
     path('api/recipes/download_shopping_cart/',
          download_shopping_list,
          name='dsc'),
+    path('api/recipes/shopping_cart_summary/',
+         shopping_cart_summary,
+         name='shopping_cart_summary'),
+    path('api/recipes/shopping_cart_export/',
+         shopping_cart_export,
+         name='shopping_cart_export'),
+    path('api/metrics/',
+         metrics,
+         name='metrics'),
     path('api/', include(router.urls)),
     path('api/', include('djoser.urls')),
     path('api/auth/', include('djoser.urls.authtoken')),
 ]
+
+if settings.ASYNC_VIEWS:
+    from .async_views import urlpatterns as async_urlpatterns
+
+    urlpatterns = async_urlpatterns + urlpatterns
@@ -1,29 +1,362 @@
-from django.shortcuts import get_object_or_404
+import csv
+import io
+import os
 
-from .models import Ingredient, RecipeIngredient
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import (BooleanField, Count, Exists, F, OuterRef,
+                              Prefetch, Sum, Value, Window,
+                              prefetch_related_objects)
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import RowNumber
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
 
+from .models import (AppUser, CartTotal, Favorite, Recipe, RecipeIngredient,
+                     ShoppingList, Subscription, Tag)
 
-def get_existence(self, obj, model):
+PDF_FONT_SIZE = 12
+PDF_LINE_HEIGHT = 18
+PDF_MARGIN = 50
+DEFERRED_RECIPE_FIELDS = {
+    'text': 'text',
+    'images': 'image_renditions',
+}
+RECIPE_FLAG_FIELDS = {
+    'is_favorited': 'is_favorited',
+    'is_in_shopping_cart': 'is_in_shopping_cart',
+    'author_is_subscribed': 'author',
+}
+
+
+def get_requested_fields(request, names):
+    names = list(names)
+    if request is None:
+        return names
+    for parameter, keep in (('fields', True), ('omit', False)):
+        value = request.query_params.get(parameter)
+        if value:
+            selected = {name.strip() for name in value.split(',')}
+            names = [name for name in names if (name in selected) == keep]
+    return names
+
+
+def get_recipes_for_read(fields=None):
+    queryset = Recipe.objects.all()
+    if fields is None or 'author' in fields:
+        queryset = queryset.select_related('author')
+    if fields is None or 'tags' in fields:
+        queryset = queryset.prefetch_related(
+            Prefetch('tags', queryset=Tag.objects.order_by('id'))
+        )
+    if fields is None or 'ingredients' in fields:
+        queryset = queryset.prefetch_related(Prefetch(
+            'ingredients_in',
+            queryset=RecipeIngredient.objects.select_related(
+                'ingredient'
+            ).order_by('id')
+        ))
+    if fields is not None:
+        queryset = queryset.defer(*(
+            column for name, column in DEFERRED_RECIPE_FIELDS.items()
+            if name not in fields
+        ))
+    return queryset
+
+
+def annotate_recipe_flags(queryset, user, fields=None):
+    if user.is_anonymous:
+        return queryset
+    flags = {
+        'is_favorited': Exists(
+            Favorite.objects.filter(user=user, recipe=OuterRef('pk'))
+        ),
+        'is_in_shopping_cart': Exists(
+            ShoppingList.objects.filter(user=user, recipe=OuterRef('pk'))
+        ),
+        'author_is_subscribed': Exists(
+            Subscription.objects.filter(user=user,
+                                        author=OuterRef('author'))
+        ),
+    }
+    if fields is not None:
+        flags = {name: flag for name, flag in flags.items()
+                 if RECIPE_FLAG_FIELDS[name] in fields}
+    return queryset.annotate(**flags)
+
+
+def get_existence(self, obj, model, annotation):
+    existence = getattr(obj, annotation, None)
+    if existence is not None:
+        return existence
     request = self.context.get('request')
     if request is None or request.user.is_anonymous:
         return False
     return model.objects.filter(user=request.user, recipe=obj).exists()
 
 
+def get_limited_recipes(author_ids, limit):
+    if not author_ids:
+        return Recipe.objects.none()
+    ranked = Recipe.objects.filter(author__in=author_ids).annotate(
+        position=Window(expression=RowNumber(),
+                        partition_by=[F('author')],
+                        order_by=F('id').desc())
+    ).order_by().values('id', 'position')
+    sql, params = ranked.query.sql_with_params()
+    return Recipe.objects.filter(id__in=RawSQL(
+        f'SELECT ranked.id FROM ({sql}) ranked WHERE ranked.position <= %s',
+        (*params, limit)
+    ))
+
+
+def get_subscribed_authors(user):
+    return AppUser.objects.filter(subscriptors__user=user).annotate(
+        is_subscribed=Value(True, output_field=BooleanField())
+    ).order_by('id')
+
+
+def prefetch_author_recipes(authors, recipes_limit):
+    if recipes_limit.isdigit():
+        recipes = get_limited_recipes(
+            [author.id for author in authors], int(recipes_limit)
+        )
+    else:
+        recipes = Recipe.objects.all()
+    prefetch_related_objects(authors, Prefetch('recipes', queryset=recipes))
+
+
 def update_or_create_ingredients(instance, ingredients):
-    for ingredient in ingredients:
-        current_ingredient = (
-            get_object_or_404(Ingredient, pk=ingredient['ingredient']['id'].id)
-            )
-        if (RecipeIngredient.objects.filter(
-                recipe=instance,
-                ingredient=current_ingredient).exists()):
-            instance.ingredients.amount = (
-                    ingredient['amount']
-            )
-        else:
-            RecipeIngredient.objects.update_or_create(
-                recipe=instance,
-                ingredient=current_ingredient,
-                amount=ingredient['amount']
-            )
+    amounts = {
+        ingredient['ingredient_id']: ingredient['amount']
+        for ingredient in ingredients
+    }
+    existing = {
+        recipe_ingredient.ingredient_id: recipe_ingredient
+        for recipe_ingredient in RecipeIngredient.objects.filter(
+            recipe=instance
+        )
+    }
+    deltas = diff_amounts(
+        {ingredient_id: (recipe_ingredient.amount, 1)
+         for ingredient_id, recipe_ingredient in existing.items()},
+        {ingredient_id: (amount, 1)
+         for ingredient_id, amount in amounts.items()}
+    )
+    to_create = [
+        RecipeIngredient(recipe=instance, ingredient_id=ingredient_id,
+                         amount=amount)
+        for ingredient_id, amount in amounts.items()
+        if ingredient_id not in existing
+    ]
+    to_update = []
+    for ingredient_id, recipe_ingredient in existing.items():
+        amount = amounts.get(ingredient_id)
+        if amount is not None and amount != recipe_ingredient.amount:
+            recipe_ingredient.amount = amount
+            to_update.append(recipe_ingredient)
+    to_delete = [
+        recipe_ingredient.pk
+        for ingredient_id, recipe_ingredient in existing.items()
+        if ingredient_id not in amounts
+    ]
+    with transaction.atomic():
+        if to_create:
+            RecipeIngredient.objects.bulk_create(to_create)
+        if to_update:
+            RecipeIngredient.objects.bulk_update(to_update, ['amount'])
+        if to_delete:
+            RecipeIngredient.objects.filter(pk__in=to_delete).delete()
+    return deltas
+
+
+def get_recipe_amounts(recipe_ids):
+    rows = (
+        RecipeIngredient.objects
+        .filter(recipe__in=recipe_ids)
+        .values('ingredient')
+        .annotate(total=Sum('amount'), entries=Count('id'))
+    )
+    return {
+        row['ingredient']: (row['total'], row['entries']) for row in rows
+    }
+
+
+def get_expected_cart_totals():
+    rows = (
+        RecipeIngredient.objects
+        .filter(recipe__recipes_in__isnull=False)
+        .values('recipe__recipes_in__user', 'ingredient')
+        .annotate(total=Sum('amount'), entries=Count('id'))
+    )
+    return {
+        (row['recipe__recipes_in__user'], row['ingredient']):
+            (row['total'], row['entries'])
+        for row in rows.iterator()
+    }
+
+
+def diff_amounts(old, new):
+    deltas = {}
+    for ingredient_id in old.keys() | new.keys():
+        old_amount, old_count = old.get(ingredient_id, (0, 0))
+        new_amount, new_count = new.get(ingredient_id, (0, 0))
+        if old_amount != new_amount or old_count != new_count:
+            deltas[ingredient_id] = (new_amount - old_amount,
+                                     new_count - old_count)
+    return deltas
+
+
+def apply_cart_deltas(user_ids, deltas):
+    if not user_ids or not deltas:
+        return
+    with transaction.atomic():
+        totals = CartTotal.objects.select_for_update().filter(
+            user__in=user_ids, ingredient__in=deltas.keys()
+        )
+        existing = {(total.user_id, total.ingredient_id): total
+                    for total in totals}
+        to_create, to_update, to_delete = [], [], []
+        for user_id in user_ids:
+            for ingredient_id, (amount, entries) in deltas.items():
+                total = existing.get((user_id, ingredient_id))
+                if total is None:
+                    if entries > 0:
+                        to_create.append(CartTotal(
+                            user_id=user_id, ingredient_id=ingredient_id,
+                            amount=amount, recipes_count=entries
+                        ))
+                    continue
+                total.amount += amount
+                total.recipes_count += entries
+                if total.recipes_count > 0:
+                    to_update.append(total)
+                else:
+                    to_delete.append(total.pk)
+        CartTotal.objects.bulk_create(to_create)
+        CartTotal.objects.bulk_update(to_update, ['amount', 'recipes_count'])
+        CartTotal.objects.filter(pk__in=to_delete).delete()
+
+
+def insert_recipe_links(model, user_id, recipe_ids):
+    recipe_ids = sorted(recipe_ids)
+    if not recipe_ids:
+        return set()
+    values = ', '.join(['(%s, %s)'] * len(recipe_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {model._meta.db_table} (user_id, recipe_id) '
+            f'VALUES {values} ON CONFLICT DO NOTHING RETURNING recipe_id',
+            [value for recipe_id in recipe_ids
+             for value in (user_id, recipe_id)]
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+def delete_recipe_links(model, user_id, recipe_ids):
+    recipe_ids = sorted(recipe_ids)
+    if not recipe_ids:
+        return set()
+    values = ', '.join(['%s'] * len(recipe_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {model._meta.db_table} WHERE user_id = %s '
+            f'AND recipe_id IN ({values}) RETURNING recipe_id',
+            [user_id, *recipe_ids]
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+def lock_user_cart(user_id):
+    list(AppUser.objects.select_for_update().filter(pk=user_id)
+         .values_list('pk', flat=True))
+
+
+def update_cart_totals(user_id, recipe_ids, sign=1):
+    deltas = {
+        ingredient_id: (sign * amount, sign * entries)
+        for ingredient_id, (amount, entries)
+        in get_recipe_amounts(recipe_ids).items()
+    }
+    apply_cart_deltas([user_id], deltas)
+
+
+def update_carts_with_recipe(recipe, deltas):
+    if not deltas:
+        return
+    user_ids = list(
+        ShoppingList.objects.filter(recipe=recipe)
+        .values_list('user', flat=True)
+    )
+    apply_cart_deltas(user_ids, deltas)
+
+
+def get_shopping_list(user):
+    return (
+        CartTotal.objects
+        .filter(user=user)
+        .values('ingredient__name', 'ingredient__measurement_unit', 'amount')
+        .order_by('ingredient__name')
+    )
+
+
+def shopping_list_rows(items):
+    for item in items:
+        yield (item['ingredient__name'], item['amount'],
+               item['ingredient__measurement_unit'])
+
+
+def shopping_list_txt(items):
+    yield 'Ваш список покупок: \n'
+    for name, amount, unit in shopping_list_rows(items):
+        yield f'{name} {amount}{unit} \n'
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def shopping_list_csv(items):
+    writer = csv.writer(Echo())
+    yield writer.writerow(('Ингредиент', 'Количество', 'Единицы измерения'))
+    for row in shopping_list_rows(items):
+        yield writer.writerow(row)
+
+
+def get_pdf_font():
+    font_path = settings.SHOPPING_LIST_PDF_FONT
+    if not os.path.exists(font_path):
+        return 'Helvetica'
+    name = os.path.splitext(os.path.basename(font_path))[0]
+    if name not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(TTFont(name, font_path))
+    return name
+
+
+def shopping_list_pdf(items):
+    buffer = io.BytesIO()
+    font = get_pdf_font()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    y = height - PDF_MARGIN
+    pdf.setFont(font, PDF_FONT_SIZE)
+    pdf.drawString(PDF_MARGIN, y, 'Ваш список покупок:')
+    for name, amount, unit in shopping_list_rows(items):
+        y -= PDF_LINE_HEIGHT
+        if y < PDF_MARGIN:
+            pdf.showPage()
+            pdf.setFont(font, PDF_FONT_SIZE)
+            y = height - PDF_MARGIN
+        pdf.drawString(PDF_MARGIN, y, f'{name} {amount}{unit}')
+    pdf.save()
+    yield buffer.getvalue()
+
+
+SHOPPING_LIST_WRITERS = {
+    'txt': shopping_list_txt,
+    'csv': shopping_list_csv,
+    'pdf': shopping_list_pdf,
+}
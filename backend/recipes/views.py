@@ -1,31 +1,69 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef
+from django.http import (FileResponse, Http404, HttpResponse,
+                         StreamingHttpResponse)
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from djoser.views import UserViewSet
+from prometheus_client import CONTENT_TYPE_LATEST
 from rest_framework import permissions, status, viewsets
-from rest_framework.decorators import api_view
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.decorators import (action, api_view,
+                                       permission_classes, renderer_classes)
 from rest_framework.response import Response
 
-from .filters import IngredientFilter, RecipeFilter
-from .models import (AppUser, Favorite, Ingredient, Recipe, RecipeIngredient,
+from .autocomplete import get_ingredient_index
+from .cache import (CachedReadMixin, CatalogSnapshot, CatalogSnapshotMixin,
+                    ConditionalGetMixin, bump_version)
+from .filters import RecipeFilter
+from .jobs import enqueue, get_export_file, get_exports_storage
+from .metrics import render_metrics
+from .models import (AppUser, CartTotal, Favorite, Ingredient, Job, Recipe,
                      ShoppingList, Subscription, Tag)
-from .permissions import IsAuthorOrReadOnly
-from .serializers import (CustomUserSerializer, FavoriteSerializer,
+from .fast_serializers import (FastRecipeListMixin, get_recipe_rows,
+                               serialize_recipe_rows)
+from .feed import get_feed_ids, get_joined_feed_ids
+from .paginations import CorePagination, FeedPagination, RecipePagination
+from .permissions import IsAuthorOrReadOnly, IsStaffOrMetricsAddress
+from .renderers import CSVRenderer, PDFRenderer, TextRenderer
+from .serializers import (CartTotalSerializer, CustomUserSerializer,
+                          FavoriteSerializer,
                           GetRecipeSerializer, GetSubscribeSerializer,
-                          IngredientSerializer, PostRecipeSerializer,
+                          IngredientSerializer, JobSerializer,
+                          PostRecipeSerializer, RecipeIdsSerializer,
                           RecipeToRepresentFavoriteSerializer,
                           ShoppingListSerializer, SubscribeSerializer,
                           TagsSerializer)
+from .utils import (SHOPPING_LIST_WRITERS, annotate_recipe_flags,
+                    delete_recipe_links, get_recipes_for_read,
+                    get_requested_fields, get_shopping_list,
+                    get_subscribed_authors, insert_recipe_links,
+                    lock_user_cart, prefetch_author_recipes,
+                    update_cart_totals)
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(ConditionalGetMixin, CachedReadMixin,
+                    FastRecipeListMixin, viewsets.ModelViewSet):
+    cache_resources = ('recipes', 'tags', 'ingredients', 'users')
+    validator_resources = ('tags', 'ingredients', 'users')
     queryset = Recipe.objects.all()
     serializer = PostRecipeSerializer
     permission_class = [IsAuthorOrReadOnly]
     filter_backends = [DjangoFilterBackend]
     filter_class = RecipeFilter
+    pagination_class = RecipePagination
+
+    def get_queryset(self):
+        if self.request.method not in permissions.SAFE_METHODS:
+            return Recipe.objects.all()
+        fields = get_requested_fields(self.request,
+                                      GetRecipeSerializer.Meta.fields)
+        return annotate_recipe_flags(get_recipes_for_read(fields),
+                                     self.request.user, fields)
+
+    def get_validator_queryset(self):
+        return Recipe.objects.all()
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
@@ -40,8 +78,21 @@ class CustomUserViewSet(UserViewSet):
     queryset = AppUser.objects.all()
     serializer_class = CustomUserSerializer
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if user.is_anonymous or 'is_subscribed' not in get_requested_fields(
+                self.request, CustomUserSerializer.Meta.fields):
+            return queryset
+        return queryset.annotate(is_subscribed=Exists(
+            Subscription.objects.filter(user=user, author=OuterRef('pk'))
+        ))
+
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(CatalogSnapshotMixin, CachedReadMixin,
+                 viewsets.ReadOnlyModelViewSet):
+    cache_resources = ('tags',)
+    snapshot = CatalogSnapshot('tags')
     queryset = Tag.objects.all()
     permission_classes = [
         permissions.AllowAny
@@ -50,16 +101,46 @@ class TagViewSet(viewsets.ReadOnlyModelViewSet):
     pagination_class = None
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(CatalogSnapshotMixin, CachedReadMixin,
+                        viewsets.ReadOnlyModelViewSet):
+    cache_resources = ('ingredients',)
+    snapshot = CatalogSnapshot('ingredients')
     queryset = Ingredient.objects.all()
     permission_classes = [
         permissions.AllowAny
     ]
     serializer_class = IngredientSerializer
-    filter_backends = [IngredientFilter]
-    search_fields = ['name', ]
     pagination_class = None
 
+    def list(self, request, *args, **kwargs):
+        name = request.query_params.get('name')
+        if not name:
+            return super().list(request, *args, **kwargs)
+        return Response(get_ingredient_index().search(
+            name, settings.INGREDIENT_SEARCH_LIMIT
+        ))
+
+
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    serializer_class = JobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        if self.request.user.is_staff:
+            return Job.objects.all()
+        return Job.objects.filter(user=self.request.user)
+
+    @action(detail=True)
+    def download(self, request, pk=None):
+        job = get_object_or_404(Job, pk=pk, user=request.user)
+        name = get_export_file(job)
+        if name is None:
+            raise Http404
+        return FileResponse(
+            get_exports_storage().open(name), as_attachment=True,
+            filename=f'shopping_list.{job.result["format"]}'
+        )
+
 
 @api_view(['GET', 'DELETE'])
 @login_required()
@@ -121,12 +202,45 @@ def subscription(request, id):
 @api_view(['GET'])
 @login_required()
 def subscriptions_list(request):
-    subscription_list = AppUser.objects.filter(subscriptors__user=request.user)
-    paginator = PageNumberPagination()
-    paginator.page_size = 6
-    result_page = paginator.paginate_queryset(subscription_list, request)
-    serializer = GetSubscribeSerializer(result_page,
-                                        many=True)
+    paginator = CorePagination()
+    result_page = paginator.paginate_queryset(
+        get_subscribed_authors(request.user), request
+    )
+    return paginator.get_paginated_response(
+        serialize_subscriptions(request, result_page)
+    )
+
+
+def serialize_subscriptions(request, authors):
+    if 'recipes' in get_requested_fields(request,
+                                         GetSubscribeSerializer.Meta.fields):
+        prefetch_author_recipes(authors,
+                                request.query_params.get('recipes_limit', ''))
+    serializer = GetSubscribeSerializer(authors,
+                                        many=True,
+                                        context={'request': request})
+    return serializer.data
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def feed(request):
+    paginator = FeedPagination()
+    get_ids = get_feed_ids if settings.FEED_FANOUT else get_joined_feed_ids
+    recipe_ids = paginator.paginate_ids(
+        lambda before, limit: get_ids(request.user, before, limit),
+        request
+    )
+    fields = get_requested_fields(request, GetRecipeSerializer.Meta.fields)
+    recipes = annotate_recipe_flags(
+        get_recipes_for_read(fields), request.user, fields
+    ).filter(id__in=recipe_ids)
+    if settings.FAST_RECIPE_SERIALIZER:
+        return paginator.get_paginated_response(serialize_recipe_rows(
+            get_recipe_rows(recipes, request.user, fields), request, fields
+        ))
+    serializer = GetRecipeSerializer(recipes, many=True,
+                                     context={'request': request})
     return paginator.get_paginated_response(serializer.data)
 
 
@@ -140,40 +254,117 @@ def shopping_list(request, id):
     if request.method == 'GET':
         serializer = ShoppingListSerializer(data=data)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        with transaction.atomic():
+            lock_user_cart(request.user.id)
+            serializer.save()
+            update_cart_totals(request.user.id, [recipe.id])
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     if request.method == 'DELETE':
-        if request.method == 'DELETE':
-            obj = ShoppingList.objects.filter(recipe=recipe, user=request.user)
-            obj.delete()
-            return Response('Рецепт удален из списка покупок',
-                            status.HTTP_204_NO_CONTENT)
+        with transaction.atomic():
+            lock_user_cart(request.user.id)
+            deleted, _ = ShoppingList.objects.filter(
+                recipe=recipe, user=request.user
+            ).delete()
+            if deleted:
+                update_cart_totals(request.user.id, [recipe.id], sign=-1)
+        return Response('Рецепт удален из списка покупок',
+                        status.HTTP_204_NO_CONTENT)
+
+
+def change_recipe_list(request, model, update_totals=False, counter=None):
+    serializer = RecipeIdsSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    recipe_ids = list(dict.fromkeys(serializer.validated_data['recipes']))
+    user = request.user
+    found = set(
+        Recipe.objects.filter(id__in=recipe_ids).values_list('id', flat=True)
+    )
+    adding = request.method == 'POST'
+    with transaction.atomic():
+        if update_totals:
+            lock_user_cart(user.id)
+        current = set(model.objects.filter(
+            user=user, recipe__in=found
+        ).values_list('recipe', flat=True))
+        if adding:
+            changed = insert_recipe_links(model, user.id, found - current)
+        else:
+            changed = delete_recipe_links(model, user.id, current)
+        if counter is not None and changed:
+            Recipe.objects.filter(id__in=changed).update(
+                **{counter: F(counter) + (1 if adding else -1)}
+            )
+        if update_totals and changed:
+            update_cart_totals(user.id, changed, sign=1 if adding else -1)
+    if changed:
+        bump_version(f'user:{user.id}')
+    done, skipped = ('added', 'exists') if adding else ('removed', 'missing')
+    results = []
+    for recipe_id in recipe_ids:
+        if recipe_id not in found:
+            result = 'not_found'
+        else:
+            result = done if recipe_id in changed else skipped
+        results.append({'id': recipe_id, 'result': result})
+    return Response({'results': results})
+
+
+@api_view(['POST', 'DELETE'])
+@permission_classes([permissions.IsAuthenticated])
+def favorite_bulk(request):
+    return change_recipe_list(request, Favorite, counter='favorites_count')
+
+
+@api_view(['POST', 'DELETE'])
+@permission_classes([permissions.IsAuthenticated])
+def shopping_cart_bulk(request):
+    return change_recipe_list(request, ShoppingList, update_totals=True)
 
 
 @api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def shopping_cart_summary(request):
+    totals = CartTotal.objects.filter(
+        user=request.user
+    ).select_related('ingredient').order_by('ingredient__name')
+    serializer = CartTotalSerializer(totals, many=True)
+    return Response(serializer.data)
+
+
+@api_view(['GET'])
+@renderer_classes([TextRenderer, CSVRenderer, PDFRenderer])
+@permission_classes([permissions.IsAuthenticated])
 def download_shopping_list(request):
-    text = 'Ваш список покупок: \n'
-    shop_list = {}
-    items = RecipeIngredient.objects.filter(
-        recipe__recipes_in__user=request.user
+    renderer = request.accepted_renderer
+    content_type = renderer.media_type
+    if renderer.charset:
+        content_type = f'{content_type}; charset={renderer.charset}'
+    items = list(get_shopping_list(request.user))
+    response = StreamingHttpResponse(
+        SHOPPING_LIST_WRITERS[renderer.format](items),
+        content_type=content_type
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="wishlist.{renderer.format}"'
     )
-    for item in items:
-        ingredients = item.ingredient.ingredients_in.values_list(
-            'ingredient__name', 'ingredient__measurement_unit', 'amount'
-        )[0]
-        name, unit, amount = ingredients[0], ingredients[1], ingredients[2]
-        if name in shop_list.keys():
-            shop_list[name]['amount'] += amount
-            print(amount)
-        else:
-            shop_list[name] = {}
-            shop_list[name]['amount'] = amount
-            shop_list[name]['measure_unit'] = unit
-    for name in shop_list:
-        text += f'{name}'
-        text += f' {shop_list[name]["amount"]}'
-        text += f'{shop_list[name]["measure_unit"]}'
-        text += f' \n'
-    response = HttpResponse(text, 'Content-Type: application/txt')
-    response['Content-Disposition'] = 'attachment; filename="wishlist"'
     return response
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def shopping_cart_export(request):
+    file_format = request.data.get('format', 'txt')
+    if file_format not in SHOPPING_LIST_WRITERS:
+        formats = ', '.join(SHOPPING_LIST_WRITERS)
+        return Response({'format': f'Доступные форматы: {formats}'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    job = enqueue('export_shopping_list', user=request.user,
+                  user_id=request.user.id, file_format=file_format)
+    serializer = JobSerializer(job, context={'request': request})
+    return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(['GET'])
+@permission_classes([IsStaffOrMetricsAddress])
+def metrics(request):
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE_LATEST)